@@ -25,54 +25,416 @@ st.set_page_config(
 
 import pandas as pd
 import numpy as np
+import requests
+import json
 import os
+import re
 import sys
 from pathlib import Path
 import sqlite3
-import joblib
-from PIL import Image
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
+import queue
+from contextlib import contextmanager
 from io import BytesIO, StringIO
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+# plotly, joblib, torch e PIL são importados sob demanda, só na página que os usa
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 # Adiciona os diretórios ao path
 sys.path.append(str(Path(__file__).parent / 'fase_4_dashboard_ml' / 'scripts'))
 sys.path.append(str(Path(__file__).parent / 'ir_alem_2_genetic_algorithm'))
 
 # Funções de cache para modelos
-@st.cache_resource
+def _model_key(model_path) -> str:
+    """Caminho absoluto em str: mesma chave de cache para Path/str relativos ou absolutos"""
+    return str(Path(model_path).resolve())
+
 def load_ml_model(model_path):
     """Carrega modelo de ML com cache"""
+    return _load_ml_model_cached(_model_key(model_path))
+
+def load_ml_onnx(model_path):
+    """Carrega a exportação ONNX do modelo de ML (None sem onnxruntime)"""
+    return _load_ml_onnx_cached(_model_key(model_path))
+
+def load_yolo_model(model_path):
+    """Carrega modelo YOLO com cache (ver _load_yolo_cached)"""
+    return _load_yolo_cached(_model_key(model_path))
+
+@st.cache_resource
+def _load_ml_model_cached(model_path: str):
+    """Carrega modelo de ML (uma vez por caminho absoluto)"""
     try:
         import joblib
         model = joblib.load(model_path)
+        # Predição de 1 linha: threads do joblib custam mais que as árvores.
+        # Atributos direto nos passos (get_params falha em pickles de sklearn antigo)
+        for _, step in getattr(model, 'steps', [(None, model)]):
+            if hasattr(step, 'n_jobs'):
+                step.n_jobs = 1
+            if hasattr(step, 'verbose'):
+                step.verbose = 0
         return model
     except Exception as e:
         st.error(f"Erro ao carregar modelo ML: {e}")
         return None
 
 @st.cache_resource
-def load_yolo_model(model_path):
-    """Carrega modelo YOLO com cache"""
+def _load_ml_onnx_cached(model_path: str):
+    """Carrega a exportação ONNX do modelo de ML (uma vez por caminho absoluto)"""
+    from fase_4_dashboard_ml.scripts.utils import load_onnx_model
+    return load_onnx_model(model_path)
+
+@st.cache_resource
+def _lazy_torch():
+    """Importa o PyTorch (opcional: sem ele, apenas a Fase 6 via torch.hub fica indisponível)"""
     try:
         import torch
-        model = torch.hub.load('ultralytics/yolov5', 'custom', 
-                              path=str(model_path), force_reload=False)
+    except ImportError:
+        return None
+    # Entrada fixa em 640x640: deixa o cuDNN escolher o algoritmo de convolução mais rápido
+    torch.backends.cudnn.benchmark = True
+    return torch
+
+def _yolov5_hub_load(model_name, **kwargs):
+    """
+    Carrega um modelo YOLOv5 via torch.hub sem consultar o GitHub.
+    Usa o clone local do repositório quando já está no cache do hub.
+    """
+    torch = _lazy_torch()
+    if torch is None:
+        raise ImportError("PyTorch não instalado. Execute: pip install -r requirements.txt")
+    
+    local_repo = Path(torch.hub.get_dir()) / 'ultralytics_yolov5_master'
+    if local_repo.exists():
+        model = torch.hub.load(str(local_repo), model_name, source='local', **kwargs)
+    else:
+        model = torch.hub.load('ultralytics/yolov5', model_name, skip_validation=True, **kwargs)
+    
+    # FP16 em GPU: metade da banda de memória dos pesos
+    if torch.cuda.is_available():
+        model.half()
+        _compile_yolo(model)
+        _warmup_yolo(model)
+    return model
+
+def _export_yolo_onnx(weights: Path, img_size=640):
+    """
+    Exporta o .pt para ONNX (batch dinâmico) com o export.py do clone local
+    do YOLOv5; o arquivo é gravado ao lado dos pesos. Sem PyTorch, sem o
+    clone ou sem o pacote onnx, não exporta e o torch.hub segue como fallback.
+    """
+    import subprocess
+    
+    torch = _lazy_torch()
+    if torch is None:
+        return
+    export_py = Path(torch.hub.get_dir()) / 'ultralytics_yolov5_master' / 'export.py'
+    if not export_py.exists():
+        return
+    try:
+        subprocess.run(
+            [sys.executable, str(export_py), '--weights', str(weights),
+             '--include', 'onnx', '--imgsz', str(img_size), '--dynamic'],
+            check=True, capture_output=True, timeout=600
+        )
+    except (subprocess.SubprocessError, OSError):
+        pass
+
+def _compile_yolo(model):
+    """
+    Compila a rede interna com torch.compile (CUDA Graphs via 'reduce-overhead').
+    O wrapper AutoShape continua em Python para .render()/.pandas().
+    """
+    torch = _lazy_torch()
+    if not hasattr(torch, 'compile'):
+        return
+    model.model = torch.compile(model.model, mode='reduce-overhead', fullgraph=False, dynamic=False)
+
+def _warmup_yolo(model, img_size=640):
+    """
+    Uma inferência em 640x640 dentro do cache_resource: o autotuner do cuDNN
+    (benchmark=True) e a compilação rodam antes do primeiro upload.
+    """
+    torch = _lazy_torch()
+    dummy = torch.zeros(1, 3, img_size, img_size, device='cuda', dtype=torch.float16)
+    try:
+        with torch.inference_mode():
+            model(dummy)
+    except Exception:
+        # Sem backend de compilação (ex.: Triton ausente): volta ao modo eager
+        model.model = getattr(model.model, '_orig_mod', model.model)
+        with torch.inference_mode():
+            model(dummy)
+
+def run_yolo_inference(model, image):
+    """Executa a detecção YOLO sem rastreamento de gradientes"""
+    # Só consulta o torch se ele já foi importado: modelo ONNX não deve puxar o PyTorch
+    torch = sys.modules.get('torch')
+    if torch is None or not isinstance(model, torch.nn.Module):
+        # Backend ONNX Runtime/TensorRT: não há autograd a desligar
+        return model(image)
+    with torch.inference_mode():
+        return model(image)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _prep_upload(digest: str, _data: bytes) -> SimpleNamespace:
+    """
+    Decodifica um upload uma única vez por SHA-1: reduz (lado máx. 1024px; o YOLO
+    reescala para 640 de qualquer forma), converte para RGB e já guarda o JPEG
+    de exibição. Reruns reaproveitam array e bytes sem decodificar de novo.
+    """
+    from PIL import Image
+    from fase_6_vision_yolo.yolo_runtime import encode_jpeg
+    
+    img = Image.open(BytesIO(_data))
+    # Tamanho lido do cabeçalho, antes de reduzir: só essas precisam ser reencodadas
+    oversized = max(img.size) > 1024
+    # thumbnail antes do convert: em JPEG o PIL decodifica já em escala reduzida (draft)
+    img.thumbnail((1024, 1024), Image.LANCZOS)
+    array = np.asarray(img.convert('RGB'))
+    return SimpleNamespace(array=array, jpeg=encode_jpeg(array), oversized=oversized)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _detect_cached(_model, model_key: str, digests: tuple, _images) -> SimpleNamespace:
+    """
+    Detecção YOLO em lote, memorizada pelo SHA-1 de cada upload + modelo.
+    Reruns disparados por outros widgets viram uma consulta ao cache.
+    As imagens renderizadas já saem em JPEG: o st.image envia os bytes
+    direto, sem reencodar (PNG) a cada rerun.
+    """
+    from fase_6_vision_yolo.yolo_runtime import encode_jpeg
+    
+    results = run_yolo_inference(_model, _images)
+    xyxy = [d.cpu().numpy() if hasattr(d, 'cpu') else np.asarray(d) for d in results.xyxy]
+    return SimpleNamespace(
+        rendered=[encode_jpeg(np.ascontiguousarray(r)) for r in results.render()],
+        xyxy=xyxy,
+        names=results.names
+    )
+
+@st.cache_resource
+def get_http_session():
+    """Sessão HTTP persistente: keep-alive reaproveita TCP/TLS entre chamadas à API da OpenAI"""
+    from urllib3.util.retry import Retry
+    
+    # Único ponto de retry/backoff (exponencial, respeita Retry-After):
+    # - 429/5xx transitórios: até 2 novas tentativas
+    # - falha ao abrir a conexão (o POST nem saiu): até 2 novas tentativas
+    # - erro de leitura: nunca; o POST já foi enviado e pode ter sido cobrado
+    retry = Retry(
+        total=2,
+        connect=2,
+        read=0,
+        other=0,
+        status=2,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'POST'}),
+        raise_on_status=False,
+    )
+    session = requests.Session()
+    session.mount('https://', requests.adapters.HTTPAdapter(
+        pool_connections=4, pool_maxsize=8, max_retries=retry
+    ))
+    return session
+
+# Prompt do LLM Vision (Fase 6), no nível do módulo: o texto enviado não herda indentação
+VISION_PROMPT = """Você é um fitopatologista especializado. Analise esta imagem de planta/cultivo e forneça:
+
+1. **Diagnóstico Visual**: O que você identifica na imagem?
+2. **Saúde da Planta**: A planta aparenta estar saudável ou com problemas?
+3. **Sintomas Observados**: Descreva manchas, descolorações, pragas visíveis, etc.
+4. **Possíveis Doenças/Pragas**: Liste hipóteses diagnósticas
+5. **Recomendações**: Ações imediatas sugeridas
+
+Seja técnico mas acessível. Use emojis para destacar pontos importantes."""
+
+# System prompt do Assistente IA, sem indentação (espaços também viram tokens)
+ASSISTANT_PROMPT = """Você é um assistente especializado em agricultura de precisão.
+Analise os dados de sensores agrícolas e responda perguntas de forma clara e objetiva.
+
+ESTATÍSTICAS DOS DADOS (últimos 50 registros):
+- Total de sensores: {total_registros}
+- Umidade do solo: média {umidade_media:.1f}%, mín {umidade_min:.1f}%, máx {umidade_max:.1f}%
+- pH do solo: média {ph_medio:.1f}, mín {ph_min:.1f}, máx {ph_max:.1f}
+- Fósforo: {fosforo}
+- Potássio: {potassio}
+- Sensores que precisam irrigação: {precisa_irrigacao}
+- Sensores que NÃO precisam irrigação: {nao_precisa_irrigacao}
+
+AMOSTRA DOS 10 REGISTROS MAIS RECENTES (CSV; {legenda_pk}, irrig = 1 se precisa irrigar):
+{amostra}
+
+Responda de forma técnica mas acessível, incluindo números e recomendações práticas quando relevante."""
+
+# Mensagens mantidas no chat do Assistente IA (cada rerun redesenha o histórico inteiro)
+CHAT_HISTORY_LIMIT = 20
+
+# Cache exato de respostas do Assistente IA, por sessão (as mais antigas saem primeiro)
+LLM_CACHE_MAX_ENTRIES = 64
+
+def _llm_cache() -> dict:
+    """
+    Cache de respostas da LLM guardado em st.session_state.
+    Fica restrito à sessão do usuário e some com ela; dict preserva a ordem de inserção.
+    """
+    return st.session_state.setdefault('llm_cache', {})
+
+def _llm_cache_key(model: str, system_prompt: str, prompt: str, max_tokens: int) -> str:
+    """Chave exata: modelo + limite de tokens + pergunta + contexto (estatísticas e amostra no system prompt)"""
+    import hashlib
+    return hashlib.sha256(f"{model}|{max_tokens}|{prompt}|{system_prompt}".encode('utf-8')).hexdigest()
+
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+
+# (conexão, leitura): a leitura vale por bloco recebido, não pela resposta inteira
+OPENAI_TIMEOUT = (5, 180)
+
+def _openai_post(payload: dict, api_key: str, **kwargs):
+    """
+    POST na API de chat da OpenAI com timeouts em camadas.
+    As novas tentativas ficam só no adaptador da sessão (get_http_session).
+    """
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}"
+    }
+    return get_http_session().post(
+        OPENAI_CHAT_URL, headers=headers, json=payload, timeout=OPENAI_TIMEOUT, **kwargs
+    )
+
+def _stream_chat(payload: dict, api_key: str):
+    """
+    Gera os trechos de texto de uma resposta da OpenAI via SSE ("stream": true).
+    O primeiro token chega em centenas de ms, e nenhuma espera isolada
+    se aproxima dos timeouts de gateway em respostas longas.
+    """
+    with _openai_post({**payload, "stream": True}, api_key, stream=True) as resp:
+        resp.raise_for_status()
+        for line in resp.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data: "):
+                continue
+            data = line[len("data: "):]
+            if data == "[DONE]":
+                break
+            choices = json.loads(data).get("choices") or []
+            if choices and choices[0].get("delta", {}).get("content"):
+                yield choices[0]["delta"]["content"]
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _call_vision(img_sha1: str, prompt_sha1: str, _jpeg_bytes: bytes, _prompt: str, _api_key: str) -> dict:
+    """
+    Análise via OpenAI Vision, memorizada por (SHA-1 do upload, SHA-1 do prompt).
+    Imagem, prompt e chave ficam fora da chave de cache (prefixo _); respostas
+    de erro levantam HTTPError e por isso nunca são cacheadas.
+    """
+    import base64
+    
+    # JPEG pronto (upload original ou o reduzido de _prep_upload): só vira base64
+    img_base64 = base64.b64encode(memoryview(_jpeg_bytes)).decode('ascii')
+    
+    payload = {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": _prompt
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:image/jpeg;base64,{img_base64}",
+                            # Tier de baixa resolução (512px): ~4x menos tokens de visão
+                            "detail": "low"
+                        }
+                    }
+                ]
+            }
+        ],
+        "max_tokens": 1000,
+        "temperature": 0.3
+    }
+    
+    response = _openai_post(payload, _api_key)
+    response.raise_for_status()
+    return response.json()
+
+# Pesos do YOLOv5s (COCO) versionados junto da Fase 6
+GENERAL_YOLO_PATH = Path("fase_6_vision_yolo/yolov5s.pt")
+
+@st.cache_resource
+def _load_yolo_cached(model_path: str):
+    """
+    Carrega modelo YOLO (uma vez por caminho absoluto).
+    Se existir a exportação ONNX ao lado do .pt (e onnxruntime estiver
+    instalado), usa ONNX Runtime com TensorRT/CUDA/CPU em vez do torch.hub.
+    """
+    try:
+        from fase_6_vision_yolo.yolo_runtime import ONNX_AVAILABLE, YoloOnnxModel
+        
+        onnx_path = Path(model_path).with_suffix('.onnx')
+        if ONNX_AVAILABLE:
+            # Primeira carga sem .onnx: exporta uma vez; as próximas já acham o arquivo
+            if not onnx_path.exists():
+                _export_yolo_onnx(Path(model_path))
+            if onnx_path.exists():
+                try:
+                    return YoloOnnxModel(str(onnx_path))
+                except Exception:
+                    # ONNX inválido/incompatível: segue para o torch.hub em vez de cachear None
+                    pass
+        
+        model = _yolov5_hub_load('custom', path=str(model_path))
         return model
     except Exception as e:
         st.error(f"Erro ao carregar modelo YOLO: {e}")
         return None
 
-# Importa módulos customizados
-try:
-    from fase_4_dashboard_ml.scripts.utils import load_model, make_prediction, plot_feature_importance
+# Importa módulos customizados sob demanda (apenas no módulo que os utiliza)
+@st.cache_resource
+def _lazy_ml_utils():
+    """Importa utilitários de ML da Fase 4"""
+    from fase_4_dashboard_ml.scripts.utils import make_prediction, plot_feature_importance
+    return make_prediction, plot_feature_importance
+
+@st.cache_resource
+def _lazy_aws():
+    """Importa o gerenciador de alertas AWS"""
+    from fase_4_dashboard_ml.scripts.aws_manager import AWSAlertManager, AlertType, AlertLevel
+    return AWSAlertManager, AlertType, AlertLevel
+
+@st.cache_resource
+def get_aws_manager():
+    """Gerenciador de alertas AWS único por processo: o cliente boto3 é compartilhado entre sessões"""
+    AWSAlertManager, _, _ = _lazy_aws()
+    return AWSAlertManager()
+
+@st.cache_resource
+def _lazy_ga():
+    """Importa o otimizador genético (Ir Além 2)"""
     from genetic_optimizer import FarmGeneticOptimizer, generate_sample_farm_items
-    from fase_4_dashboard_ml.scripts.aws_manager import AWSAlertManager, AWSManager, AlertLevel
-except ImportError as e:
-    st.error(f"Erro ao importar módulos: {e}")
-    st.info("Execute: pip install -r requirements.txt")
-    st.stop()
+    return FarmGeneticOptimizer, generate_sample_farm_items
+
+@st.cache_resource
+def _lazy_px():
+    """Importa plotly.express (~400ms a frio) apenas nas páginas com gráficos"""
+    import plotly.express as px
+    return px
+
+def _require(loader):
+    """Executa um import tardio, interrompendo a página se o módulo estiver ausente"""
+    try:
+        return loader()
+    except ImportError as e:
+        st.error(f"Erro ao importar módulos: {e}")
+        st.info("Execute: pip install -r requirements.txt")
+        st.stop()
 
 # ============================================
 # FUNÇÕES AUXILIARES
@@ -88,25 +450,315 @@ def generate_sensor_locations(num_sensors=20):
     center_lat = -21.1767
     center_lon = -47.8208
     
-    # Gera pontos aleatórios em um raio de ~10km
-    np.random.seed(42)
-    locations = []
+    # Gera pontos aleatórios em um raio de ~10km, numa única chamada:
+    # cada linha sorteia (lat, lon, umidade, pH) na mesma sequência do seed 42
+    u = np.random.RandomState(42).random_sample((num_sensors, 4))
+    low = np.array([-0.08, -0.08, 15.0, 5.5])
+    high = np.array([0.08, 0.08, 60.0, 8.5])
+    samples = low + (high - low) * u
     
-    for i in range(num_sensors):
+    idx = np.arange(num_sensors)
+    return pd.DataFrame({
+        'sensor_id': [f'ESP32-{i+1:03d}' for i in idx],
         # Offset aleatório (aproximadamente 0.1 grau = ~11km)
-        lat_offset = np.random.uniform(-0.08, 0.08)
-        lon_offset = np.random.uniform(-0.08, 0.08)
+        'lat': center_lat + samples[:, 0],
+        'lon': center_lon + samples[:, 1],
+        'humidity': samples[:, 2],
+        'ph': samples[:, 3],
+        'sector': [f'Setor {chr(65 + i % 6)}' for i in idx]  # A, B, C, D, E, F
+    })
+
+@st.cache_data(show_spinner=False)
+def _load_agro_csv(path: str, mtime: float) -> pd.DataFrame:
+    """Carrega o CSV agrícola da Fase 1 com cache entre reruns (o mtime invalida quando o arquivo muda)"""
+    # Parser Arrow multi-thread (pyarrow já vem com o Streamlit) e schema explícito
+    df = pd.read_csv(
+        path,
+        sep=';',
+        encoding='utf-8',
+        engine='pyarrow',
+        dtype={
+            'Estado': 'object',
+            'Area Plantada (ha)': 'int64',
+            'Producao (toneladas)': 'int64',
+            'Classificacao de Produtividade': 'object'
+        }
+    )
+    
+    # Classificação como categoria ordenada e colunas numéricas compactadas
+    df['Classificacao de Produtividade'] = pd.Categorical(
+        df['Classificacao de Produtividade'],
+        categories=['Alta', 'Media', 'Baixa'],
+        ordered=True
+    )
+    for col in ('Area Plantada (ha)', 'Producao (toneladas)'):
+        df[col] = pd.to_numeric(df[col], downcast='unsigned')
+    
+    return df
+
+def _top_k_ascending(df: pd.DataFrame, col: str, k: int = 10) -> pd.DataFrame:
+    """
+    Top-k linhas por `col`, em ordem crescente (pronto para barh).
+    Para tabelas grandes usa np.argpartition (O(N)) em vez de ordenar tudo.
+    """
+    if len(df) < 50:
+        return df.nlargest(k, col).sort_values(col)
+    # Cópia com sinal: em colunas unsigned, -values daria a volta (0 viraria o maior)
+    values = df[col].to_numpy().astype(np.int64)
+    idx = np.argpartition(-values, k)[:k]
+    idx = idx[np.argsort(values[idx], kind='stable')]
+    return df.iloc[idx]
+
+@st.cache_data(show_spinner=False)
+def _agro_aggregates(df: pd.DataFrame) -> SimpleNamespace:
+    """
+    Pré-calcula os agregados da Fase 1 uma única vez por DataFrame.
+    Evita repetir somas, nlargest e value_counts a cada rerun.
+    """
+    area_total = df['Area Plantada (ha)'].to_numpy().sum()
+    prod_total = df['Producao (toneladas)'].to_numpy().sum()
+    
+    class_counts = df['Classificacao de Produtividade'].value_counts().reset_index()
+    class_counts.columns = ['Classificacao', 'Quantidade']
+    
+    return SimpleNamespace(
+        area_total=area_total,
+        prod_total=prod_total,
+        produtividade_media=prod_total / area_total,
+        top10=_top_k_ascending(df, 'Producao (toneladas)'),
+        class_counts=class_counts
+    )
+
+# Cores por classe de produtividade (mesma ordem das categorias do loader)
+_CLASS_COLORS = {'Alta': '#4CAF50', 'Media': '#FFC107', 'Baixa': '#F44336'}
+
+@st.cache_resource(show_spinner=False)
+def _fig_top10(top_10: pd.DataFrame) -> "go.Figure":
+    """Figura Top 10 estados, reutilizada enquanto os dados não mudam"""
+    px = _lazy_px()
+    fig = px.bar(
+        top_10,
+        x='Producao (toneladas)',
+        y='Estado',
+        orientation='h',
+        title='Top 10 Estados por Produção',
+        labels={'Producao (toneladas)': 'Produção (toneladas)'},
+        color='Producao (toneladas)',
+        color_continuous_scale='Greens',
+        height=500
+    )
+    fig.update_layout(showlegend=False, hovermode='y')
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def _fig_classes(class_counts: pd.DataFrame) -> "go.Figure":
+    """Figura de distribuição por classificação, reutilizada entre reruns"""
+    px = _lazy_px()
+    fig = px.pie(
+        class_counts,
+        values='Quantidade',
+        names='Classificacao',
+        title='Distribuição por Classificação de Produtividade',
+        color='Classificacao',
+        color_discrete_map=_CLASS_COLORS,
+        height=500
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def _fig_scatter(df: pd.DataFrame) -> "go.Figure":
+    """Figura Área vs Produção, reutilizada entre reruns"""
+    classes = df['Classificacao de Produtividade']
+    px = _lazy_px()
+    fig = px.scatter(
+        df,
+        x='Area Plantada (ha)',
+        y='Producao (toneladas)',
+        color='Classificacao de Produtividade',
+        size='Producao (toneladas)',
+        hover_name='Estado',
+        hover_data={'Area Plantada (ha)': ':,.0f', 'Producao (toneladas)': ':,.0f'},
+        title='Relação Área Plantada vs Produção',
+        labels={
+            'Area Plantada (ha)': 'Área Plantada (ha)',
+            'Producao (toneladas)': 'Produção (toneladas)'
+        },
+        color_discrete_map=_CLASS_COLORS,
+        # Ordem vem direto do dtype categórico, sem varrer a coluna atrás de valores únicos
+        category_orders={'Classificacao de Produtividade': list(classes.cat.categories)},
+        # Scattergl: o navegador desenha os pontos via WebGL
+        render_mode='webgl',
+        height=600
+    )
+    fig.update_layout(hovermode='closest')
+    return fig
+
+@st.cache_resource(show_spinner=False)
+def _fig_fitness(history: pd.DataFrame) -> "go.Figure":
+    """Figura da evolução do fitness do AG, reutilizada para o mesmo histórico"""
+    px = _lazy_px()
+    fig = px.line(
+        history,
+        x='Geração',
+        y=['Fitness Médio', 'Fitness Máximo'],
+        title='Evolução do Algoritmo Genético',
+        labels={'value': 'Fitness (R$)', 'variable': 'Métrica'},
+        markers=True,
+        height=500
+    )
+    
+    fig.update_traces(
+        line_color='#2E7D32',
+        line_width=2,
+        marker=dict(size=6, color='#4CAF50')
+    )
+    
+    fig.update_layout(
+        hovermode='x unified',
+        plot_bgcolor='white',
+        xaxis=dict(gridcolor='lightgray'),
+        yaxis=dict(gridcolor='lightgray')
+    )
+    return fig
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_farm_items(num_items: int, seed: int = 42) -> pd.DataFrame:
+    """Culturas de exemplo do AG, geradas uma única vez por (num_items, seed)"""
+    _, generate_sample_farm_items = _lazy_ga()
+    df = generate_sample_farm_items(num_items, seed=seed)
+    # Downcast de Custo/Valor, com piso em int16 para somas do resumo não estourarem
+    for col in ('Custo', 'Valor'):
+        smallest = pd.to_numeric(df[col], downcast='integer').dtype
+        df[col] = df[col].astype(np.promote_types(smallest, np.int16))
+    return df
+
+@st.cache_data(show_spinner=False)
+def _load_static_image(path: str, mtime: float) -> bytes:
+    """
+    Bytes de uma imagem estática: o st.image os envia sem decodificar/reencodar no servidor.
+    O mtime na chave invalida o cache quando o arquivo muda.
+    """
+    return Path(path).read_bytes()
+
+@st.cache_data(show_spinner=False)
+def _read_text(path: str, mtime: float) -> str:
+    """Lê um arquivo de texto; o mtime na chave invalida o cache quando o arquivo muda"""
+    return Path(path).read_text(encoding='utf-8')
+
+SQLITE_POOL_SIZE = 4
+# Espera máxima por uma conexão livre antes de abrir uma avulsa
+SQLITE_POOL_TIMEOUT = 2.0
+
+# Ajustes por conexão (não gravam no arquivo); o WAL é ativado pelo initialize_database da Fase 4
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-20000",     # ~20 MB de cache de páginas por conexão
+    "PRAGMA mmap_size=134217728",   # 128 MB mapeados em memória
+)
+
+def _make_sqlite_conn(path: str) -> sqlite3.Connection:
+    """Conexão SQLite somente leitura (mode=ro; timeout = busy_timeout de 5s)"""
+    uri = f"{Path(path).resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None, timeout=5.0)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+@st.cache_resource
+def _sqlite_pool(path: str) -> "queue.Queue[sqlite3.Connection]":
+    """Pool de conexões SQLite de longa duração, compartilhado entre reruns e sessões"""
+    pool = queue.Queue()
+    for _ in range(SQLITE_POOL_SIZE):
+        pool.put(_make_sqlite_conn(path))
+    return pool
+
+@contextmanager
+def _sqlite_conn(path: str):
+    """Empresta uma conexão do pool e a devolve ao sair do bloco (pool esgotado: conexão avulsa)"""
+    pool = _sqlite_pool(path)
+    try:
+        conn, pooled = pool.get(timeout=SQLITE_POOL_TIMEOUT), True
+    except queue.Empty:
+        conn, pooled = _make_sqlite_conn(path), False
+    try:
+        yield conn
+    finally:
+        if pooled:
+            pool.put(conn)
+        else:
+            conn.close()
+
+@st.cache_data(ttl=60)
+def _load_irrigation(db_path: str, limit: int = 10) -> pd.DataFrame:
+    """Carrega os registros mais recentes de irrigação (cache de 60s)"""
+    with _sqlite_conn(db_path) as conn:
+        cur = conn.execute(
+            "SELECT * FROM irrigation_data ORDER BY timestamp DESC LIMIT ?", (limit,)
+        )
+        cols = [d[0] for d in cur.description]
+        df = pd.DataFrame.from_records(cur.fetchall(), columns=cols)
+    # Formato explícito evita a inferência de datas do pandas
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', errors='coerce')
+    return df
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _assistant_context(db_path: str, mtime: float, limit: int = 50):
+    """Estatísticas e amostra dos registros recentes para o Assistente IA
+
+    O mtime na chave invalida o cache quando o banco é gravado.
+    """
+    with _sqlite_conn(db_path) as conn:
+        # O banco da Fase 4 registra a bomba (pump_state) e P/K como presença (0/1);
+        # o da Fase 2 usa needs_irrigation e P/K em ppm (REAL)
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(irrigation_data)")}
+        em_ppm = 'needs_irrigation' in cols
+        irrigar = 'needs_irrigation' if em_ppm else 'pump_state'
+        
+        # Agregações no SQLite: uma linha volta para o Python em vez de 50 registros
+        row = conn.execute(
+            f"""SELECT COUNT(*), AVG(humidity), MIN(humidity), MAX(humidity),
+                       AVG(ph), MIN(ph), MAX(ph), AVG(phosphorus), AVG(potassium),
+                       COALESCE(SUM({irrigar}), 0), COALESCE(SUM({irrigar} = 0), 0)
+                FROM (SELECT * FROM irrigation_data ORDER BY id DESC LIMIT ?)""",
+            (limit,),
+        ).fetchone()
+        
+        # Amostra de dados recentes em CSV compacto: cabeçalho uma vez, valores arredondados
+        rows = conn.execute(
+            f"SELECT humidity, ph, phosphorus, potassium, {irrigar} "
+            "FROM irrigation_data ORDER BY id DESC LIMIT 10"
+        ).fetchall()
+        # NULL vira campo vazio; floats com 1 casa, flags sem casas (.0f aceita int e float)
+        def fmt(v, spec: str) -> str:
+            return "" if v is None else format(v, spec)
         
-        locations.append({
-            'sensor_id': f'ESP32-{i+1:03d}',
-            'lat': center_lat + lat_offset,
-            'lon': center_lon + lon_offset,
-            'humidity': np.random.uniform(15, 60),
-            'ph': np.random.uniform(5.5, 8.5),
-            'sector': f'Setor {chr(65 + i % 6)}'  # A, B, C, D, E, F
-        })
+        pk = ".1f" if em_ppm else ".0f"
+        sample_data = "\n".join(
+            ["humidity,ph,P,K,irrig"]
+            + [",".join((fmt(h, ".1f"), fmt(ph, ".1f"), fmt(p, pk), fmt(k, pk), fmt(i, ".0f")))
+               for h, ph, p, k, i in rows]
+        )
+    
+    # Tabela vazia: AVG/MIN/MAX vêm NULL; nan mantém a formatação do prompt
+    row = [float('nan') if v is None else v for v in row]
+    keys = (
+        "total_registros", "umidade_media", "umidade_min", "umidade_max",
+        "ph_medio", "ph_min", "ph_max", "fosforo_medio", "potassio_medio",
+        "precisa_irrigacao", "nao_precisa_irrigacao",
+    )
+    stats = dict(zip(keys, row))
     
-    return pd.DataFrame(locations)
+    # Rótulos de P/K coerentes com a unidade do banco
+    if em_ppm:
+        stats["fosforo"] = f"média {stats['fosforo_medio']:.1f} ppm"
+        stats["potassio"] = f"média {stats['potassio_medio']:.1f} ppm"
+        stats["legenda_pk"] = "P/K = fósforo/potássio em ppm"
+    else:
+        stats["fosforo"] = f"presente em {stats['fosforo_medio'] * 100:.0f}% dos registros"
+        stats["potassio"] = f"presente em {stats['potassio_medio'] * 100:.0f}% dos registros"
+        stats["legenda_pk"] = "P/K = presença de fósforo/potássio (0/1)"
+    return stats, sample_data
 
 def create_download_csv(df, filename):
     """Gera botão de download CSV"""
@@ -119,9 +771,96 @@ def create_download_csv(df, filename):
         key=f"download_{filename}"
     )
 
+@st.fragment
+def _render_fase1_tabs(df: pd.DataFrame, agg: SimpleNamespace):
+    """Abas de visualização da Fase 1; interações reexecutam apenas este fragmento"""
+    tab1, tab2, tab3 = st.tabs(["Top 10 Estados", "Classificação", "Distribuição"])
+
+    with tab1:
+        # Top 10 estados por produção (Plotly, figura cacheada)
+        top_10 = agg.top10
+        st.plotly_chart(_fig_top10(top_10), use_container_width=True)
+
+        # Download dos dados
+        create_download_csv(top_10, "top_10_estados_producao.csv")
+
+    with tab2:
+        # Distribuição por classificação (Plotly, figura cacheada)
+        st.plotly_chart(_fig_classes(agg.class_counts), use_container_width=True)
+
+    with tab3:
+        # Scatter plot: Área vs Produção (Plotly, figura cacheada)
+        st.plotly_chart(_fig_scatter(df), use_container_width=True)
+
+        # Download dos dados completos
+        create_download_csv(df, "dados_agricolas_completo.csv")
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_predict(humidity: int, phosphorus: int, potassium: int, ph: float, model_key: str,
+                    _predictor, _make_prediction) -> tuple:
+    """Predição memorizada pelas 4 entradas + versão do modelo (o modelo em si não é hasheado)"""
+    # Array na ordem de treino, sem overhead de DataFrame
+    X = np.array([[humidity, phosphorus, potassium, ph]], dtype=np.float32)
+    return _make_prediction(_predictor, X)
+
+@st.fragment
+def _render_prediction(model, make_prediction, plot_feature_importance, predictor=None, model_key=""):
+    """
+    Interface de predição da Fase 4; sliders reexecutam apenas este fragmento.
+    A predição usa `predictor` (ONNX) quando disponível; a explicabilidade
+    sempre usa o pipeline sklearn. `model_key` identifica a versão do modelo
+    no cache de predições.
+    """
+    st.subheader("🎯 Fazer Predição")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        humidity = st.slider('Umidade do Solo (%)', 0, 100, 50, 1)
+        ph = st.slider('pH do Solo', 0.0, 14.0, 7.0, 0.1)
+
+    with col2:
+        phosphorus = st.selectbox('Fósforo Presente', [0, 1], index=1, 
+                                 format_func=lambda x: "Sim" if x == 1 else "Não")
+        potassium = st.selectbox('Potássio Presente', [0, 1], index=1,
+                                format_func=lambda x: "Sim" if x == 1 else "Não")
+
+    if st.button('🚀 Obter Predição', type="primary"):
+        # Faz predição (cliques repetidos com as mesmas entradas vêm do cache)
+        prediction_label, confidence = _cached_predict(
+            humidity, phosphorus, potassium, ph, model_key, predictor or model, make_prediction
+        )
+
+        # Mostra resultado
+        st.markdown("---")
+        st.subheader("📊 Resultado da Predição")
+
+        if prediction_label == "IRRIGATE":
+            st.success(f"💧 **{prediction_label}**")
+            st.info(f"**Confiança:** {confidence}")
+            st.markdown("💡 **Recomendação:** Ativar sistema de irrigação")
+        else:
+            st.info(f"🚫 **{prediction_label}**")
+            st.success(f"**Confiança:** {confidence}")
+            st.markdown("💡 **Recomendação:** Irrigação não necessária no momento")
+
+        # Explicabilidade
+        st.markdown("---")
+        st.subheader("🧠 Explicabilidade da IA")
+
+        feature_names = ['humidity', 'phosphorus', 'potassium', 'ph']
+        plot_feature_importance(model, feature_names)
+
+        st.markdown("""
+        **📚 Interpretação:**
+        - **Barras maiores** = características mais importantes
+        - **Humidity**: Fator mais crítico para irrigação
+        - **pH**: Afeta absorção de nutrientes
+        - **Nutrientes**: Influenciam necessidade de água
+        """)
+
 # CSS Profissional - Clean Corporate Theme
-st.markdown("""
-<style>
+_CSS_TEXT = """
     /* Reset e Variáveis */
     :root {
         --primary-green: #2E7D32;
@@ -227,8 +966,15 @@ st.markdown("""
         border: 1px solid var(--medium-gray) !important;
         border-radius: 4px;
     }
-</style>
-""", unsafe_allow_html=True)
+"""
+
+# Elementos são reenviados a cada rerun (mesmo vindos de cache), então o CSS
+# é minificado uma única vez na importação para encolher o payload do websocket
+_CSS_MIN = re.sub(r'/\*.*?\*/', '', _CSS_TEXT, flags=re.S)
+_CSS_MIN = re.sub(r'\s+', ' ', _CSS_MIN)
+_CSS_MIN = re.sub(r'\s*([{};,])\s*', r'\1', _CSS_MIN).strip()
+_CSS_HTML = f"<style>{_CSS_MIN}</style>"
+st.markdown(_CSS_HTML, unsafe_allow_html=True)
 
 # Header principal
 st.markdown('<div class="main-header">FarmTech Solutions | Sistema Integrado de Agricultura de Precisão</div>', 
@@ -326,8 +1072,9 @@ elif fase == "Fase 1: Análise de Dados":
     
     if csv_path.exists():
         try:
-            # Lê o CSV com separador de ponto e vírgula
-            df = pd.read_csv(csv_path, sep=';', encoding='utf-8')
+            # Lê o CSV com separador de ponto e vírgula (cacheado)
+            df = _load_agro_csv(str(csv_path), csv_path.stat().st_mtime)
+            agg = _agro_aggregates(df)
             
             st.success(f"✅ Dados carregados: {len(df)} estados")
             
@@ -343,11 +1090,11 @@ elif fase == "Fase 1: Análise de Dados":
             with col1:
                 st.metric(
                     "🌾 Área Total Plantada",
-                    f"{df['Area Plantada (ha)'].sum():,.0f} ha"
+                    f"{agg.area_total:,.0f} ha"
                 )
                 st.metric(
                     "📊 Produção Total",
-                    f"{df['Producao (toneladas)'].sum():,.0f} ton"
+                    f"{agg.prod_total:,.0f} ton"
                 )
             
             with col2:
@@ -355,78 +1102,15 @@ elif fase == "Fase 1: Análise de Dados":
                     "📍 Estados Analisados",
                     len(df)
                 )
-                produtividade_media = df['Producao (toneladas)'].sum() / df['Area Plantada (ha)'].sum()
                 st.metric(
                     "⚡ Produtividade Média",
-                    f"{produtividade_media:.2f} ton/ha"
+                    f"{agg.produtividade_media:.2f} ton/ha"
                 )
             
             # Gráficos Interativos
             st.subheader("📊 Visualizações Interativas")
             
-            tab1, tab2, tab3 = st.tabs(["Top 10 Estados", "Classificação", "Distribuição"])
-            
-            with tab1:
-                # Top 10 estados por produção (Plotly)
-                top_10 = df.nlargest(10, 'Producao (toneladas)').sort_values('Producao (toneladas)')
-                
-                fig = px.bar(
-                    top_10,
-                    x='Producao (toneladas)',
-                    y='Estado',
-                    orientation='h',
-                    title='Top 10 Estados por Produção',
-                    labels={'Producao (toneladas)': 'Produção (toneladas)'},
-                    color='Producao (toneladas)',
-                    color_continuous_scale='Greens',
-                    height=500
-                )
-                fig.update_layout(showlegend=False, hovermode='y')
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Download dos dados
-                create_download_csv(top_10, "top_10_estados_producao.csv")
-            
-            with tab2:
-                # Distribuição por classificação (Plotly)
-                class_counts = df['Classificacao de Produtividade'].value_counts().reset_index()
-                class_counts.columns = ['Classificacao', 'Quantidade']
-                
-                fig = px.pie(
-                    class_counts,
-                    values='Quantidade',
-                    names='Classificacao',
-                    title='Distribuição por Classificação de Produtividade',
-                    color='Classificacao',
-                    color_discrete_map={'Alta': '#4CAF50', 'Media': '#FFC107', 'Baixa': '#F44336'},
-                    height=500
-                )
-                fig.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with tab3:
-                # Scatter plot: Área vs Produção (Plotly)
-                fig = px.scatter(
-                    df,
-                    x='Area Plantada (ha)',
-                    y='Producao (toneladas)',
-                    color='Classificacao de Produtividade',
-                    size='Producao (toneladas)',
-                    hover_name='Estado',
-                    hover_data={'Area Plantada (ha)': ':,.0f', 'Producao (toneladas)': ':,.0f'},
-                    title='Relação Área Plantada vs Produção',
-                    labels={
-                        'Area Plantada (ha)': 'Área Plantada (ha)',
-                        'Producao (toneladas)': 'Produção (toneladas)'
-                    },
-                    color_discrete_map={'Alta': '#4CAF50', 'Media': '#FFC107', 'Baixa': '#F44336'},
-                    height=600
-                )
-                fig.update_layout(hovermode='closest')
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Download dos dados completos
-                create_download_csv(df, "dados_agricolas_completo.csv")
+            _render_fase1_tabs(df, agg)
                 
         except Exception as e:
             st.error(f"❌ Erro ao carregar dados: {e}")
@@ -462,8 +1146,7 @@ elif fase == "Fase 2: Banco de Dados":
     
     if der_path.exists():
         st.subheader("📐 Diagrama Entidade-Relacionamento (DER)")
-        image = Image.open(der_path)
-        st.image(image, caption="DER FarmTech Solutions", use_column_width=True)
+        st.image(_load_static_image(str(der_path), der_path.stat().st_mtime), caption="DER FarmTech Solutions", use_column_width=True)
         
         st.markdown("---")
         
@@ -496,10 +1179,7 @@ elif fase == "Fase 2: Banco de Dados":
         db_path = Path("fase_4_dashboard_ml/irrigation.db")
         if db_path.exists():
             try:
-                conn = sqlite3.connect(str(db_path))
-                query = "SELECT * FROM irrigation_data ORDER BY timestamp DESC LIMIT 10"
-                df_db = pd.read_sql_query(query, conn)
-                conn.close()
+                df_db = _load_irrigation(str(db_path))
                 
                 st.dataframe(df_db, use_container_width=True)
                 st.success(f"✅ {len(df_db)} registros mostrados")
@@ -535,6 +1215,7 @@ elif fase == "Fase 3: IoT ESP32":
     sensor_data['size'] = 50  # Tamanho dos pontos
     
     # Cria mapa interativo com Plotly
+    px = _lazy_px()
     fig = px.scatter_mapbox(
         sensor_data,
         lat='lat',
@@ -598,8 +1279,7 @@ elif fase == "Fase 3: IoT ESP32":
     firmware_path = Path("fase_3_iot_esp32/prog1.ino")
     if firmware_path.exists():
         with st.expander("🔍 Ver Código Completo (prog1.ino)"):
-            with open(firmware_path, 'r', encoding='utf-8') as f:
-                code = f.read()
+            code = _read_text(str(firmware_path), firmware_path.stat().st_mtime)
             st.code(code, language='cpp', line_numbers=True)
         
         # Componentes
@@ -632,6 +1312,8 @@ elif fase == "Fase 3: IoT ESP32":
 # FASE 4: ML Dashboard
 # ============================================
 elif fase == "Fase 4: Machine Learning":
+    make_prediction, plot_feature_importance = _require(_lazy_ml_utils)
+    
     st.markdown('<div class="phase-header">Fase 4: Machine Learning - Predição de Irrigação</div>', 
                 unsafe_allow_html=True)
     
@@ -662,60 +1344,12 @@ elif fase == "Fase 4: Machine Learning":
             
             st.markdown("---")
             
-            # Interface de predição
-            st.subheader("🎯 Fazer Predição")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                humidity = st.slider('Umidade do Solo (%)', 0, 100, 50, 1)
-                ph = st.slider('pH do Solo', 0.0, 14.0, 7.0, 0.1)
-            
-            with col2:
-                phosphorus = st.selectbox('Fósforo Presente', [0, 1], index=1, 
-                                         format_func=lambda x: "Sim" if x == 1 else "Não")
-                potassium = st.selectbox('Potássio Presente', [0, 1], index=1,
-                                        format_func=lambda x: "Sim" if x == 1 else "Não")
-            
-            if st.button('🚀 Obter Predição', type="primary"):
-                # Prepara dados
-                input_data = pd.DataFrame({
-                    'humidity': [humidity],
-                    'phosphorus': [phosphorus],
-                    'potassium': [potassium],
-                    'ph': [ph]
-                })
-                
-                # Faz predição
-                prediction_label, confidence = make_prediction(model, input_data)
-                
-                # Mostra resultado
-                st.markdown("---")
-                st.subheader("📊 Resultado da Predição")
-                
-                if prediction_label == "IRRIGATE":
-                    st.success(f"💧 **{prediction_label}**")
-                    st.info(f"**Confiança:** {confidence}")
-                    st.markdown("💡 **Recomendação:** Ativar sistema de irrigação")
-                else:
-                    st.info(f"🚫 **{prediction_label}**")
-                    st.success(f"**Confiança:** {confidence}")
-                    st.markdown("💡 **Recomendação:** Irrigação não necessária no momento")
-                
-                # Explicabilidade
-                st.markdown("---")
-                st.subheader("🧠 Explicabilidade da IA")
-                
-                feature_names = ['humidity', 'phosphorus', 'potassium', 'ph']
-                plot_feature_importance(model, feature_names)
-                
-                st.markdown("""
-                **📚 Interpretação:**
-                - **Barras maiores** = características mais importantes
-                - **Humidity**: Fator mais crítico para irrigação
-                - **pH**: Afeta absorção de nutrientes
-                - **Nutrientes**: Influenciam necessidade de água
-                """)
+            # Interface de predição (fragmento: widgets só reexecutam este trecho)
+            onnx_path = model_path.with_suffix('.onnx')
+            predictor = load_ml_onnx(str(onnx_path)) if onnx_path.exists() else None
+            # Versão + mtime do .joblib: um modelo retreinado invalida o cache de predições
+            model_key = f"v1.0:{model_path.stat().st_mtime_ns}"
+            _render_prediction(model, make_prediction, plot_feature_importance, predictor, model_key)
     else:
         st.warning(f"⚠️ Modelo não encontrado: {model_path}")
         st.info("💡 Execute: python fase_4_dashboard_ml/scripts/train_model.py")
@@ -724,6 +1358,8 @@ elif fase == "Fase 4: Machine Learning":
 # FASE 5 & IR ALÉM 1: AWS
 # ============================================
 elif fase == "Fase 5: AWS & Alertas":
+    _, AlertType, AlertLevel = _require(_lazy_aws)
+    
     st.markdown('<div class="phase-header">Fase 5: Infraestrutura AWS e Sistema de Alertas</div>',
                 unsafe_allow_html=True)
     
@@ -737,8 +1373,7 @@ elif fase == "Fase 5: AWS & Alertas":
     
     cost_img_path = Path("fase_5_aws_docs/docs/aws_comparison_cost.png")
     if cost_img_path.exists():
-        image = Image.open(cost_img_path)
-        st.image(image, caption="Análise de Custos AWS", use_column_width=True)
+        st.image(_load_static_image(str(cost_img_path), cost_img_path.stat().st_mtime), caption="Análise de Custos AWS", use_column_width=True)
     else:
         st.warning(f"⚠️ Imagem não encontrada: {cost_img_path}")
     
@@ -747,11 +1382,8 @@ elif fase == "Fase 5: AWS & Alertas":
     # Sistema de alertas
     st.subheader("🔔 Sistema de Alertas AWS SNS (Nova Versão - v2.0)")
     
-    # Inicializa AWS Alert Manager (nova versão)
-    if 'aws_manager' not in st.session_state:
-        st.session_state.aws_manager = AWSAlertManager()
-    
-    aws_manager = st.session_state.aws_manager
+    # AWS Alert Manager (nova versão), compartilhado por todas as sessões
+    aws_manager = _require(get_aws_manager)
     
     # Mostra status
     stats = aws_manager.get_statistics()
@@ -831,12 +1463,11 @@ elif fase == "Fase 5: AWS & Alertas":
         alert_level = st.selectbox("Nível", ["INFO", "WARNING", "CRITICAL", "EMERGENCY"])
         
         if st.button("📤 Enviar Alerta Genérico", type="primary"):
-            from fase_4_dashboard_ml.scripts.aws_manager import AlertType, AlertLevel as AL
             result = aws_manager.send_alert(
                 subject=alert_title,
                 message=alert_details,
                 alert_type=AlertType.CUSTOM,
-                severity=AL[alert_level]
+                severity=AlertLevel[alert_level]
             )
             if result['success']:
                 st.success("✅ Alerta enviado com sucesso!")
@@ -931,162 +1562,148 @@ elif fase == "Fase 6: Visão Computacional":
     # Upload de imagem
     st.subheader("📸 Detecção e Análise")
     
-    uploaded_file = st.file_uploader(
-        "Faça upload de uma imagem",
+    uploaded_files = st.file_uploader(
+        "Faça upload de uma ou mais imagens",
         type=['jpg', 'jpeg', 'png'],
-        help="Envie uma imagem de planta/cultivo para análise"
+        accept_multiple_files=True,
+        help="Envie imagens de plantas/cultivos; várias imagens são detectadas num único lote"
     )
     
-    if uploaded_file is not None:
+    if uploaded_files:
         try:
-            # Carrega imagem
-            from io import BytesIO
-            import base64
+            # Decodificação/redução memorizadas por SHA-1 do upload
+            import hashlib
             
-            image = Image.open(BytesIO(uploaded_file.read()))
-            uploaded_file.seek(0)
+            digests = tuple(hashlib.sha1(f.getvalue()).hexdigest() for f in uploaded_files)
+            preps = [_prep_upload(d, f.getvalue()) for d, f in zip(digests, uploaded_files)]
+            images = [p.array for p in preps]
             
-            # Layout de 2 colunas
-            col1, col2 = st.columns(2)
+            # Detecta todas as imagens num único lote (uma chamada ao modelo)
+            results = None
+            try:
+                # Carrega modelo apropriado
+                if model_source == "custom":
+                    model = load_yolo_model(model_path)
+                elif model_source == "pretrained" and GENERAL_YOLO_PATH.exists():
+                    # Pesos locais: mesmo cache/backend ONNX do modelo FarmTech
+                    model = load_yolo_model(GENERAL_YOLO_PATH)
+                elif model_source == "pretrained":
+                    # Cache do modelo geral
+                    if 'yolo_general_model' not in st.session_state:
+                        with st.spinner("📥 Baixando YOLOv5s (primeira vez)..."):
+                            st.session_state.yolo_general_model = _yolov5_hub_load(
+                                'yolov5s',
+                                pretrained=True
+                            )
+                    model = st.session_state.yolo_general_model
+                else:
+                    st.error("❌ Nenhum modelo disponível")
+                    st.stop()
+                
+                if model is not None:
+                    model_key = f"{model_source}:{model_path or GENERAL_YOLO_PATH}"
+                    results = _detect_cached(model, model_key, digests, images)
+                else:
+                    st.error("❌ Falha ao carregar modelo")
             
-            with col1:
-                st.subheader("📷 Imagem Original")
-                st.image(image, use_column_width=True)
+            except Exception as e:
+                st.error(f"❌ Erro na detecção: {e}")
+                st.code(str(e))
             
-            with col2:
-                st.subheader("🎯 Detecções YOLO")
+            for img_idx, (uploaded_file, prep) in enumerate(zip(uploaded_files, preps)):
+                if len(images) > 1:
+                    st.markdown(f"#### 🖼️ {uploaded_file.name}")
                 
-                try:
-                    # Carrega modelo apropriado
-                    if model_source == "custom":
-                        model = load_yolo_model(model_path)
-                    elif model_source == "pretrained":
-                        # Cache do modelo geral
-                        if 'yolo_general_model' not in st.session_state:
-                            with st.spinner("📥 Baixando YOLOv5s (primeira vez)..."):
-                                import torch
-                                st.session_state.yolo_general_model = torch.hub.load(
-                                    'ultralytics/yolov5', 
-                                    'yolov5s',
-                                    pretrained=True,
-                                    force_reload=False
-                                )
-                        model = st.session_state.yolo_general_model
-                    else:
-                        st.error("❌ Nenhum modelo disponível")
-                        st.stop()
+                # Layout de 2 colunas
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.subheader("📷 Imagem Original")
+                    st.image(prep.jpeg, use_column_width=True)
+                
+                with col2:
+                    st.subheader("🎯 Detecções YOLO")
                     
-                    if model is not None:
-                        # Faz detecção
-                        results = model(image)
-                        
+                    if results is not None:
                         # Renderiza resultados
-                        result_img = results.render()[0]
+                        result_img = results.rendered[img_idx]
                         st.image(result_img, use_column_width=True)
                         
-                        # Extrai detecções
-                        detections = results.pandas().xyxy[0]
+                        # Detecções já em NumPy (x1, y1, x2, y2, conf, cls)
+                        det_arr = results.xyxy[img_idx]
+                        names = results.names
+                        det_names = [names[int(c)] for c in det_arr[:, 5]]
                         
-                        if len(detections) > 0:
-                            st.success(f"✅ {len(detections)} objeto(s) detectado(s)!")
+                        if len(det_arr) > 0:
+                            st.success(f"✅ {len(det_arr)} objeto(s) detectado(s)!")
                             
-                            # Tabela de detecções
+                            # Tabela de detecções (um único DataFrame para exibição).
+                            # Percentual formatado no navegador via column_config: sem Styler
+                            # (callback Python por célula) e a coluna continua numérica/ordenável
+                            detections = pd.DataFrame({
+                                'name': det_names,
+                                'confidence': det_arr[:, 4] * 100,
+                                'xmin': det_arr[:, 0],
+                                'ymin': det_arr[:, 1],
+                                'xmax': det_arr[:, 2],
+                                'ymax': det_arr[:, 3]
+                            })
                             st.dataframe(
-                                detections[['name', 'confidence', 'xmin', 'ymin', 'xmax', 'ymax']]
-                                .style.format({'confidence': '{:.2%}'}),
+                                detections,
+                                column_config={
+                                    'confidence': st.column_config.NumberColumn('confidence', format="%.2f%%")
+                                },
                                 use_container_width=True
                             )
                             
                             # Alertas AWS para detecções com alta confiança
-                            for idx, det in detections.iterrows():
-                                if det['confidence'] > 0.7:
-                                    st.warning(f"⚠️ Alta confiança: {det['name']} ({det['confidence']*100:.1f}%)")
-                                    
-                                    if st.button(f"📤 Enviar Alerta AWS", key=f"alert_{idx}"):
-                                        if 'aws_manager' not in st.session_state:
-                                            st.session_state.aws_manager = AWSAlertManager()
-                                        
-                                        result = st.session_state.aws_manager.notify_pest_detection(
-                                            pest_name=det['name'],
-                                            confidence=det['confidence'],
-                                            image_path=uploaded_file.name,
-                                            location="Dashboard - Análise YOLO"
-                                        )
-                                        if result['success']:
-                                            st.success(f"✅ Alerta enviado! Modo: {result['mode']}")
+                            # Máscara vetorizada: o corpo só roda para as detecções acima do limiar
+                            hi_idx = np.flatnonzero(det_arr[:, 4] > 0.7).tolist()
+                            high_conf = [(det_names[i], float(det_arr[i, 4])) for i in hi_idx]
+                            for idx, (name, conf) in zip(hi_idx, high_conf):
+                                st.warning(f"⚠️ Alta confiança: {name} ({conf*100:.1f}%)")
+                                
+                                if st.button(f"📤 Enviar Alerta AWS", key=f"alert_{img_idx}_{idx}"):
+                                    result = _require(get_aws_manager).notify_pest_detection(
+                                        pest_name=name,
+                                        confidence=conf,
+                                        image_path=uploaded_file.name,
+                                        location="Dashboard - Análise YOLO"
+                                    )
+                                    if result['success']:
+                                        st.success(f"✅ Alerta enviado! Modo: {result['mode']}")
+                            
+                            # Envio em lote: SNS PublishBatch (até 10 alertas por chamada) em vez de um por clique
+                            if len(high_conf) > 1 and st.button(
+                                f"📤 Enviar Todos os Alertas ({len(high_conf)})", key=f"alert_all_{img_idx}"
+                            ):
+                                results_aws = _require(get_aws_manager).notify_pest_detections(
+                                    high_conf,
+                                    image_path=uploaded_file.name,
+                                    location="Dashboard - Análise YOLO"
+                                )
+                                sent = sum(r['success'] for r in results_aws)
+                                st.success(f"✅ {sent}/{len(results_aws)} alertas enviados! Modo: {results_aws[0]['mode']}")
                         else:
                             st.info("ℹ️ Nenhum objeto detectado pelo YOLO")
-                    
-                    else:
-                        st.error("❌ Falha ao carregar modelo")
                 
-                except Exception as e:
-                    st.error(f"❌ Erro na detecção: {e}")
-                    st.code(str(e))
-            
-            # Análise LLM Vision (se habilitada)
-            if llm_analysis and 'llm_api_key' in locals() and llm_api_key:
-                st.markdown("---")
-                st.subheader("🧠 Análise Fitopatológica via LLM Vision")
-                
-                with st.spinner("🔬 Analisando imagem com IA generativa..."):
-                    try:
-                        import requests
-                        import base64
-                        
-                        # Converte imagem para base64
-                        buffered = BytesIO()
-                        image.save(buffered, format="JPEG")
-                        img_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
-                        
-                        # Prompt especializado
-                        vision_prompt = """Você é um fitopatologista especializado. Analise esta imagem de planta/cultivo e forneça:
-
-1. **Diagnóstico Visual**: O que você identifica na imagem?
-2. **Saúde da Planta**: A planta aparenta estar saudável ou com problemas?
-3. **Sintomas Observados**: Descreva manchas, descolorações, pragas visíveis, etc.
-4. **Possíveis Doenças/Pragas**: Liste hipóteses diagnósticas
-5. **Recomendações**: Ações imediatas sugeridas
-
-Seja técnico mas acessível. Use emojis para destacar pontos importantes."""
-
-                        headers = {
-                            "Content-Type": "application/json",
-                            "Authorization": f"Bearer {llm_api_key}"
-                        }
-                        
-                        payload = {
-                            "model": "gpt-4o-mini",
-                            "messages": [
-                                {
-                                    "role": "user",
-                                    "content": [
-                                        {
-                                            "type": "text",
-                                            "text": vision_prompt
-                                        },
-                                        {
-                                            "type": "image_url",
-                                            "image_url": {
-                                                "url": f"data:image/jpeg;base64,{img_base64}"
-                                            }
-                                        }
-                                    ]
-                                }
-                            ],
-                            "max_tokens": 1000,
-                            "temperature": 0.3
-                        }
-                        
-                        response = requests.post(
-                            "https://api.openai.com/v1/chat/completions",
-                            headers=headers,
-                            json=payload,
-                            timeout=60
-                        )
-                        
-                        if response.status_code == 200:
-                            result = response.json()
+                # Análise LLM Vision (se habilitada)
+                if llm_analysis and 'llm_api_key' in locals() and llm_api_key:
+                    st.markdown("---")
+                    st.subheader(f"🧠 Análise Fitopatológica via LLM Vision ({uploaded_file.name})")
+                    
+                    with st.spinner("🔬 Analisando imagem com IA generativa..."):
+                        try:
+                            # Upload JPEG dentro do limite segue com os bytes originais
+                            is_jpeg = uploaded_file.type in ('image/jpeg', 'image/jpg')
+                            result = _call_vision(
+                                digests[img_idx],
+                                hashlib.sha1(VISION_PROMPT.encode('utf-8')).hexdigest(),
+                                uploaded_file.getvalue() if is_jpeg and not prep.oversized else prep.jpeg,
+                                VISION_PROMPT,
+                                llm_api_key
+                            )
+                            
                             analysis = result['choices'][0]['message']['content']
                             
                             st.markdown("### 📋 Relatório Fitopatológico")
@@ -1102,14 +1719,13 @@ Seja técnico mas acessível. Use emojis para destacar pontos importantes."""
                             with col3:
                                 st.metric("Total", usage.get('total_tokens', 'N/A'))
                         
-                        else:
-                            st.error(f"❌ Erro na API: {response.status_code}")
-                            st.code(response.text)
-                    
-                    except Exception as e:
-                        st.error(f"❌ Erro na análise LLM: {e}")
+                        except requests.HTTPError as e:
+                            st.error(f"❌ Erro na API: {e.response.status_code}")
+                            st.code(e.response.text)
+                        except Exception as e:
+                            st.error(f"❌ Erro na análise LLM: {e}")
             
-            elif llm_analysis and (not 'llm_api_key' in locals() or not llm_api_key):
+            if llm_analysis and (not 'llm_api_key' in locals() or not llm_api_key):
                 st.info("💡 Configure a API Key acima para habilitar análise LLM Vision")
         
         except Exception as e:
@@ -1142,6 +1758,8 @@ Seja técnico mas acessível. Use emojis para destacar pontos importantes."""
 # IR ALÉM 2: Algoritmo Genético
 # ============================================
 elif fase == "Otimização Genética":
+    FarmGeneticOptimizer, _ = _require(_lazy_ga)
+    
     st.markdown('<div class="phase-header">Otimização com Algoritmo Genético</div>', 
                 unsafe_allow_html=True)
     
@@ -1167,16 +1785,19 @@ elif fase == "Otimização Genética":
     with col3:
         crossover_rate = st.slider("🧬 Taxa de Crossover", 0.0, 1.0, 0.8, 0.1)
         mutation_rate = st.slider("🎲 Taxa de Mutação", 0.0, 0.5, 0.15, 0.05)
+        num_islands = st.slider("🏝️ Ilhas (populações em paralelo)", 1, 8, 4, 1,
+                                help="A população é dividida entre as ilhas; cada ilha evolui em uma thread e a cada 50 gerações o melhor indivíduo migra")
     
     st.markdown("---")
     
-    # Gera dados de culturas
+    # Gera dados de culturas: o seed só avança no clique, então reruns reutilizam o cache
     if st.button("🎲 Gerar Dados de Culturas", type="secondary"):
-        st.session_state['farm_items'] = generate_sample_farm_items(num_items)
+        st.session_state['farm_seed'] = st.session_state.get('farm_seed', 42) + 1
+        st.session_state['farm_items'] = _cached_farm_items(num_items, st.session_state['farm_seed'])
     
     # Mostra tabela de culturas
     if 'farm_items' not in st.session_state:
-        st.session_state['farm_items'] = generate_sample_farm_items(num_items)
+        st.session_state['farm_items'] = _cached_farm_items(num_items, st.session_state.get('farm_seed', 42))
     
     st.subheader("🌱 Culturas Disponíveis")
     st.dataframe(st.session_state['farm_items'], use_container_width=True)
@@ -1204,7 +1825,8 @@ elif fase == "Otimização Genética":
                     population_size=population_size,
                     num_generations=num_generations,
                     crossover_rate=crossover_rate,
-                    mutation_rate=mutation_rate
+                    mutation_rate=mutation_rate,
+                    num_islands=num_islands
                 )
                 
                 # Executa otimização
@@ -1241,33 +1863,10 @@ elif fase == "Otimização Genética":
                 st.subheader("📈 Evolução do Fitness (Interativo)")
                 
                 # history já é um DataFrame com colunas: 'Geração', 'Fitness Médio', 'Fitness Máximo'
-                fig = px.line(
-                    history,
-                    x='Geração',
-                    y=['Fitness Médio', 'Fitness Máximo'],
-                    title='Evolução do Algoritmo Genético',
-                    labels={'value': 'Fitness (R$)', 'variable': 'Métrica'},
-                    markers=True,
-                    height=500
-                )
-                
-                fig.update_traces(
-                    line_color='#2E7D32',
-                    line_width=2,
-                    marker=dict(size=6, color='#4CAF50')
-                )
-                
-                fig.update_layout(
-                    hovermode='x unified',
-                    plot_bgcolor='white',
-                    xaxis=dict(gridcolor='lightgray'),
-                    yaxis=dict(gridcolor='lightgray')
-                )
-                
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(_fig_fitness(history), use_container_width=True)
                 
                 # Download do histórico
-                create_download_csv(history_df, "evolucao_fitness.csv")
+                create_download_csv(history, "evolucao_fitness.csv")
                 
                 # Insights
                 st.subheader("💡 Insights")
@@ -1328,6 +1927,11 @@ elif fase == "Assistente IA":
             ["gpt-4o-mini", "gpt-4o", "gpt-3.5-turbo"],
             help="gpt-4o-mini é mais rápido e barato"
         )
+        max_tok = st.slider(
+            "Tamanho máx. da resposta",
+            100, 1200, 300, 50,
+            help="Limite de tokens gerados; menor = resposta mais rápida e barata"
+        )
     
     st.markdown("---")
     
@@ -1354,12 +1958,13 @@ elif fase == "Assistente IA":
         db_path = Path("fase_4_dashboard_ml/irrigation.db")
         if db_path.exists():
             try:
-                conn = sqlite3.connect(db_path)
-                df = pd.read_sql_query("SELECT * FROM irrigation_data ORDER BY id DESC LIMIT 10", conn)
-                conn.close()
+                # Uma única conexão do pool para a contagem e o preview
+                with _sqlite_conn(str(db_path)) as conn:
+                    total = conn.execute("SELECT COUNT(*) FROM irrigation_data").fetchone()[0]
+                    df = pd.read_sql_query("SELECT * FROM irrigation_data ORDER BY id DESC LIMIT 10", conn)
                 
                 st.dataframe(df, use_container_width=True)
-                st.caption(f"Mostrando 10 registros mais recentes de {len(pd.read_sql_query('SELECT COUNT(*) FROM irrigation_data', sqlite3.connect(db_path)))} total")
+                st.caption(f"Mostrando {len(df)} registros mais recentes de {total} total")
                 
             except Exception as e:
                 st.error(f"Erro ao carregar dados: {e}")
@@ -1378,6 +1983,8 @@ elif fase == "Assistente IA":
         for message in st.session_state.messages:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
+                if message.get("cached"):
+                    st.caption("⚡ Resposta do cache (sem chamada à API)")
         
         # Input do usuário
         if prompt := st.chat_input("Faça uma pergunta sobre os dados agrícolas..."):
@@ -1390,6 +1997,8 @@ elif fase == "Assistente IA":
             
             # Processa resposta
             with st.chat_message("assistant"):
+                streamed = False
+                cache_hit = False
                 with st.spinner("Analisando dados..."):
                     try:
                         # Carrega dados do banco
@@ -1398,56 +2007,13 @@ elif fase == "Assistente IA":
                         if not db_path.exists():
                             response = "❌ Banco de dados não encontrado. Execute a Fase 4 primeiro para gerar dados."
                         else:
-                            conn = sqlite3.connect(db_path)
-                            df = pd.read_sql_query("SELECT * FROM irrigation_data ORDER BY id DESC LIMIT 50", conn)
-                            conn.close()
-                            
-                            # Prepara contexto dos dados
-                            stats = {
-                                "total_registros": len(df),
-                                "umidade_media": df['humidity'].mean(),
-                                "umidade_min": df['humidity'].min(),
-                                "umidade_max": df['humidity'].max(),
-                                "ph_medio": df['ph'].mean(),
-                                "ph_min": df['ph'].min(),
-                                "ph_max": df['ph'].max(),
-                                "fosforo_medio": df['phosphorus'].mean(),
-                                "potassio_medio": df['potassium'].mean(),
-                                "precisa_irrigacao": df['needs_irrigation'].sum(),
-                                "nao_precisa_irrigacao": (df['needs_irrigation'] == 0).sum()
-                            }
-                            
-                            # Amostra de dados recentes
-                            sample_data = df.head(10).to_dict('records')
+                            # Leitura e agregação em cache até o banco mudar
+                            stats, sample_data = _assistant_context(str(db_path), db_path.stat().st_mtime)
                             
                             # Monta prompt para a LLM
-                            system_prompt = f"""Você é um assistente especializado em agricultura de precisão. 
-                            Analise os dados de sensores agrícolas e responda perguntas de forma clara e objetiva.
-                            
-                            ESTATÍSTICAS DOS DADOS (últimos 50 registros):
-                            - Total de sensores: {stats['total_registros']}
-                            - Umidade do solo: média {stats['umidade_media']:.1f}%, mín {stats['umidade_min']:.1f}%, máx {stats['umidade_max']:.1f}%
-                            - pH do solo: média {stats['ph_medio']:.1f}, mín {stats['ph_min']:.1f}, máx {stats['ph_max']:.1f}
-                            - Fósforo: média {stats['fosforo_medio']:.1f} ppm
-                            - Potássio: média {stats['potassio_medio']:.1f} ppm
-                            - Sensores que precisam irrigação: {stats['precisa_irrigacao']}
-                            - Sensores que NÃO precisam irrigação: {stats['nao_precisa_irrigacao']}
-                            
-                            AMOSTRA DOS 10 REGISTROS MAIS RECENTES:
-                            {sample_data}
-                            
-                            Responda de forma técnica mas acessível, incluindo números e recomendações práticas quando relevante.
-                            """
-                            
-                            # Chama API da OpenAI
-                            import requests
-                            import json
-                            
-                            headers = {
-                                "Content-Type": "application/json",
-                                "Authorization": f"Bearer {api_key}"
-                            }
+                            system_prompt = ASSISTANT_PROMPT.format(**stats, amostra=sample_data)
                             
+                            # Chama API da OpenAI (sessão HTTP compartilhada, resposta em streaming)
                             payload = {
                                 "model": model_choice,
                                 "messages": [
@@ -1455,30 +2021,44 @@ elif fase == "Assistente IA":
                                     {"role": "user", "content": prompt}
                                 ],
                                 "temperature": 0.7,
-                                "max_tokens": 800
+                                "max_tokens": max_tok
                             }
                             
-                            api_response = requests.post(
-                                "https://api.openai.com/v1/chat/completions",
-                                headers=headers,
-                                json=payload,
-                                timeout=30
-                            )
+                            # Mesma pergunta sobre os mesmos dados: responde do cache, sem API
+                            cache = _llm_cache()
+                            cache_key = _llm_cache_key(model_choice, system_prompt, prompt, max_tok)
+                            cached = cache.get(cache_key)
                             
-                            if api_response.status_code == 200:
-                                result = api_response.json()
-                                response = result['choices'][0]['message']['content']
+                            if cached is not None:
+                                response = cached
+                                cache_hit = True
                             else:
-                                response = f"❌ Erro na API: {api_response.status_code} - {api_response.text}"
+                                try:
+                                    # Tokens aparecem conforme chegam; retorna o texto completo
+                                    response = st.write_stream(_stream_chat(payload, api_key))
+                                    streamed = True
+                                    cache[cache_key] = response
+                                    # Limite de entradas: descarta a resposta mais antiga
+                                    if len(cache) > LLM_CACHE_MAX_ENTRIES:
+                                        cache.pop(next(iter(cache)))
+                                except requests.HTTPError as e:
+                                    response = f"❌ Erro na API: {e.response.status_code} - {e.response.text}"
                     
                     except Exception as e:
                         response = f"❌ Erro ao processar pergunta: {str(e)}"
                     
-                    # Mostra resposta
-                    st.markdown(response)
+                    # Mostra resposta (a versão em streaming já foi escrita)
+                    if not streamed:
+                        st.markdown(response)
+                    if cache_hit:
+                        st.caption("⚡ Resposta do cache (sem chamada à API)")
                     
                     # Adiciona resposta ao histórico
-                    st.session_state.messages.append({"role": "assistant", "content": response})
+                    st.session_state.messages.append(
+                        {"role": "assistant", "content": response, "cached": cache_hit}
+                    )
+                    # Mantém só as mensagens recentes: memória e redesenho limitados
+                    del st.session_state.messages[:-CHAT_HISTORY_LIMIT]
         
         # Botão para limpar histórico
         if st.session_state.messages:
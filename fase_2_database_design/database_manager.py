@@ -11,12 +11,13 @@ Data: 2025-11-22
 Versão: 2.0.0 (Enterprise Edition)
 """
 
-from sqlalchemy import create_engine, Column, Integer, Float, String, DateTime, Boolean
+from sqlalchemy import create_engine, event, func, select, text, Column, Integer, Float, String, DateTime, Boolean, Index
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
 from datetime import datetime
 from pathlib import Path
 import logging
-import random
+import numpy as np
 from typing import Optional, List
 
 # Configuração de logging
@@ -26,6 +27,26 @@ logger = logging.getLogger(__name__)
 # Base para modelos ORM
 Base = declarative_base()
 
+# PRAGMAs aplicados a cada nova conexão SQLite: WAL permite leitores durante a
+# escrita e synchronous=NORMAL evita um fsync por commit (seguro em modo WAL)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",   # 256 MB mapeados em memória
+    "PRAGMA cache_size=-65536",     # 64 MB de cache de páginas
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _set_sqlite_pragmas(dbapi_conn, connection_record) -> None:
+    """Listener do evento 'connect' do SQLAlchemy para engines SQLite."""
+    cursor = dbapi_conn.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
 
 # ============================================
 # DEFINIÇÃO DE MODELOS ORM
@@ -40,7 +61,7 @@ class IrrigationData(Base):
     __tablename__ = 'irrigation_data'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    timestamp = Column(DateTime, default=datetime.now, nullable=False)
+    timestamp = Column(DateTime, default=datetime.now, nullable=False, index=True)
     
     # Dados dos sensores
     humidity = Column(Float, nullable=False, comment="Umidade do solo (%)")
@@ -63,9 +84,13 @@ class SensorReading(Base):
     Armazena dados brutos dos sensores ESP32.
     """
     __tablename__ = 'sensor_readings'
+    # Filtro por sensor + intervalo de tempo; também atende buscas só por sensor_id
+    __table_args__ = (
+        Index('ix_sensor_readings_sensor_id_timestamp', 'sensor_id', 'timestamp'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    timestamp = Column(DateTime, default=datetime.now, nullable=False)
+    timestamp = Column(DateTime, default=datetime.now, nullable=False, index=True)
     sensor_id = Column(String(50), nullable=False, comment="ID do sensor ESP32")
     
     # Leituras
@@ -87,7 +112,7 @@ class PestDetection(Base):
     __tablename__ = 'pest_detections'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    timestamp = Column(DateTime, default=datetime.now, nullable=False)
+    timestamp = Column(DateTime, default=datetime.now, nullable=False, index=True)
     
     # Informações da detecção
     pest_type = Column(String(100), nullable=False, comment="Tipo de praga detectada")
@@ -139,8 +164,23 @@ class DatabaseManager:
             db_path = Path(__file__).parent.parent / "irrigation.db"
             database_url = f"sqlite:///{db_path}"
         
+        is_sqlite = make_url(database_url).get_backend_name() == 'sqlite'
+        engine_kwargs = {'echo': False}
+        if not is_sqlite:
+            # Servidores (PostgreSQL/MySQL): pool maior, LIFO para reaproveitar
+            # conexões quentes, pre-ping contra conexões derrubadas e reciclagem horária
+            engine_kwargs.update(
+                pool_size=10,
+                max_overflow=20,
+                pool_pre_ping=True,
+                pool_recycle=3600,
+                pool_use_lifo=True,
+            )
+        
         self.database_url = database_url
-        self.engine = create_engine(database_url, echo=False)
+        self.engine = create_engine(database_url, **engine_kwargs)
+        if is_sqlite:
+            event.listen(self.engine, 'connect', _set_sqlite_pragmas)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         
         logger.info(f"DatabaseManager inicializado: {database_url}")
@@ -203,36 +243,32 @@ class DatabaseManager:
             
             logger.info(f"Gerando {num_records} registros sintéticos...")
             
-            records = []
-            for i in range(num_records):
-                # Gera dados sintéticos baseados em lógica agrícola
-                humidity = random.uniform(15, 60)
-                ph = random.uniform(5.5, 8.5)
-                phosphorus = random.uniform(10, 100)
-                potassium = random.uniform(50, 300)
-                
-                # Lógica de decisão: irriga se umidade < 30% OU pH fora da faixa ideal
-                needs_irrigation = (humidity < 30) or (ph < 6.0) or (ph > 7.5)
-                
-                record = IrrigationData(
-                    humidity=round(humidity, 2),
-                    ph=round(ph, 2),
-                    phosphorus=round(phosphorus, 2),
-                    potassium=round(potassium, 2),
-                    needs_irrigation=needs_irrigation
+            # Amostragem vetorizada: cada coluna sai de uma única chamada NumPy
+            rng = np.random.default_rng()
+            humidity = rng.uniform(15, 60, num_records)
+            ph = rng.uniform(5.5, 8.5, num_records)
+            phosphorus = rng.uniform(10, 100, num_records)
+            potassium = rng.uniform(50, 300, num_records)
+            
+            # Lógica de decisão: irriga se umidade < 30% OU pH fora da faixa ideal
+            needs_irrigation = (humidity < 30) | (ph < 6.0) | (ph > 7.5)
+            
+            # Dicionários simples em vez de objetos ORM: sem identity map nem unit-of-work
+            # (.tolist() já devolve float/bool do Python, aceitos por qualquer driver)
+            rows = [
+                {'humidity': h, 'ph': p, 'phosphorus': phos, 'potassium': k, 'needs_irrigation': n}
+                for h, p, phos, k, n in zip(
+                    humidity.round(2).tolist(),
+                    ph.round(2).tolist(),
+                    phosphorus.round(2).tolist(),
+                    potassium.round(2).tolist(),
+                    needs_irrigation.tolist()
                 )
-                records.append(record)
-                
-                # Commit em lotes de 50 para performance
-                if (i + 1) % 50 == 0:
-                    session.add_all(records)
-                    session.commit()
-                    records = []
-                    logger.info(f"Inseridos {i + 1} registros...")
+            ]
             
-            # Insere registros restantes
-            if records:
-                session.add_all(records)
+            # Insert em massa (executemany do SQLAlchemy Core) numa única transação
+            if rows:
+                session.execute(IrrigationData.__table__.insert(), rows)
                 session.commit()
             
             final_count = session.query(IrrigationData).count()
@@ -255,11 +291,12 @@ class DatabaseManager:
         session = self.get_session()
         
         try:
-            stats = {
-                'irrigation_data': session.query(IrrigationData).count(),
-                'sensor_readings': session.query(SensorReading).count(),
-                'pest_detections': session.query(PestDetection).count(),
-            }
+            # Um único SELECT com uma subconsulta COUNT(*) por tabela (1 round-trip)
+            models = (IrrigationData, SensorReading, PestDetection)
+            row = session.execute(
+                select(*(select(func.count()).select_from(m).scalar_subquery() for m in models))
+            ).one()
+            stats = {m.__tablename__: count for m, count in zip(models, row)}
             return stats
         finally:
             session.close()
@@ -270,24 +307,26 @@ class DatabaseManager:
         
         Útil para testes e desenvolvimento.
         """
-        session = self.get_session()
+        models = (PestDetection, SensorReading, IrrigationData)
         
         try:
             logger.warning("⚠️ ATENÇÃO: Removendo todos os dados...")
             
-            session.query(PestDetection).delete()
-            session.query(SensorReading).delete()
-            session.query(IrrigationData).delete()
+            # Uma transação; sem ORM (nada de cascatas por objeto a verificar)
+            with self.engine.begin() as conn:
+                if self.engine.dialect.name == 'postgresql':
+                    # TRUNCATE não varre as linhas e reinicia as sequências dos IDs
+                    tables = ", ".join(m.__tablename__ for m in models)
+                    conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY"))
+                else:
+                    for model in models:
+                        conn.execute(model.__table__.delete())
             
-            session.commit()
             logger.info("✅ Todos os dados foram removidos")
             
         except Exception as e:
-            session.rollback()
             logger.error(f"❌ Erro ao limpar dados: {e}")
             raise
-        finally:
-            session.close()
 
 
 # ============================================
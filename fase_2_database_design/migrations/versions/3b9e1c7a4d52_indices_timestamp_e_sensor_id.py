@@ -0,0 +1,32 @@
+"""Índices em timestamp e (sensor_id, timestamp)
+
+Revision ID: 3b9e1c7a4d52
+Revises: f8d6152866df
+Create Date: 2026-10-16 02:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e1c7a4d52'
+down_revision: Union[str, None] = 'f8d6152866df'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_irrigation_data_timestamp'), 'irrigation_data', ['timestamp'], unique=False)
+    op.create_index(op.f('ix_pest_detections_timestamp'), 'pest_detections', ['timestamp'], unique=False)
+    op.create_index(op.f('ix_sensor_readings_timestamp'), 'sensor_readings', ['timestamp'], unique=False)
+    op.create_index('ix_sensor_readings_sensor_id_timestamp', 'sensor_readings', ['sensor_id', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sensor_readings_sensor_id_timestamp', table_name='sensor_readings')
+    op.drop_index(op.f('ix_sensor_readings_timestamp'), table_name='sensor_readings')
+    op.drop_index(op.f('ix_pest_detections_timestamp'), table_name='pest_detections')
+    op.drop_index(op.f('ix_irrigation_data_timestamp'), table_name='irrigation_data')
@@ -18,8 +18,10 @@ Versão: 2.0.0
 
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from enum import Enum
 
 # Configurar logging
@@ -79,6 +81,9 @@ class AWSAlertManager:
         >>> manager.notify_pest_detection("Lagarta", confidence=0.92)
     """
     
+    # Máximo de entradas aceitas pelo SNS PublishBatch
+    SNS_BATCH_SIZE = 10
+    
     def __init__(
         self,
         topic_arn: Optional[str] = None,
@@ -105,9 +110,10 @@ class AWSAlertManager:
             f'arn:aws:sns:{region}:123456789012:FarmTechAlerts'
         )
         
-        # Estatísticas
+        # Estatísticas (protegidas por lock: envios em lote rodam em threads)
         self._alerts_sent = 0
         self._alerts_failed = 0
+        self._stats_lock = threading.Lock()
         
         # Tenta inicializar conexão AWS (com fallback automático)
         self._initialize_aws_connection()
@@ -121,6 +127,7 @@ class AWSAlertManager:
         """
         try:
             import boto3
+            from botocore.config import Config
             from botocore.exceptions import (
                 NoCredentialsError,
                 PartialCredentialsError,
@@ -128,8 +135,15 @@ class AWSAlertManager:
                 BotoCoreError
             )
             
-            # Tenta criar o cliente SNS
-            self.sns_client = boto3.client('sns', region_name=self.region)
+            # Tenta criar o cliente SNS (pool de conexões reaproveitado entre publicações)
+            self.sns_client = boto3.client(
+                'sns',
+                region_name=self.region,
+                config=Config(
+                    max_pool_connections=10,
+                    retries={'max_attempts': 3, 'mode': 'adaptive'}
+                )
+            )
             
             # Valida credenciais com uma chamada leve
             try:
@@ -246,7 +260,8 @@ class AWSAlertManager:
         print("✅ Alerta simulado (AWS não configurado)")
         print("=" * 70 + "\n")
         
-        self._alerts_sent += 1
+        with self._stats_lock:
+            self._alerts_sent += 1
         
         return {
             'success': True,
@@ -271,7 +286,8 @@ class AWSAlertManager:
             )
             
             message_id = response.get('MessageId')
-            self._alerts_sent += 1
+            with self._stats_lock:
+                self._alerts_sent += 1
             
             logger.info(f"✅ Alerta enviado via AWS SNS")
             logger.info(f"   Message ID: {message_id}")
@@ -284,7 +300,8 @@ class AWSAlertManager:
             }
             
         except Exception as e:
-            self._alerts_failed += 1
+            with self._stats_lock:
+                self._alerts_failed += 1
             logger.error(f"❌ Erro ao enviar via SNS: {e}")
             
             # Fallback para simulação
@@ -364,6 +381,23 @@ class AWSAlertManager:
         Example:
             >>> manager.notify_pest_detection("Lagarta", confidence=0.94)
         """
+        subject, message, severity = self._pest_alert(pest_name, confidence, image_path, location)
+        
+        return self.send_alert(
+            subject=subject,
+            message=message,
+            alert_type=AlertType.PEST_DETECTION,
+            severity=severity
+        )
+    
+    @staticmethod
+    def _pest_alert(
+        pest_name: str,
+        confidence: float,
+        image_path: Optional[str],
+        location: str
+    ) -> Tuple[str, str, AlertLevel]:
+        """Monta assunto, mensagem e severidade de um alerta de praga."""
         confidence_pct = confidence * 100
         
         # Severidade baseada na confiança
@@ -387,21 +421,114 @@ class AWSAlertManager:
         
         message += "\nAÇÃO: Inspecionar área e avaliar controle."
         
-        return self.send_alert(
-            subject=subject,
-            message=message,
-            alert_type=AlertType.PEST_DETECTION,
-            severity=severity
-        )
+        return subject, message, severity
+    
+    def notify_pest_detections(
+        self,
+        detections: List[Tuple[str, float]],
+        image_path: Optional[str] = None,
+        location: str = "Área Monitorada",
+        max_inflight: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Envia alertas de várias detecções de praga de uma vez (Fase 6).
+        
+        No modo real, os alertas vão em chamadas SNS PublishBatch de até
+        SNS_BATCH_SIZE entradas (um round-trip para cada 10 alertas), e até
+        max_inflight lotes ficam em voo ao mesmo tempo. No modo simulação
+        o envio é sequencial.
+        
+        Args:
+            detections: Lista de (nome da praga, confiança)
+            image_path: Caminho da imagem (opcional)
+            location: Localização da detecção
+            max_inflight: Máximo de lotes PublishBatch simultâneos
+        
+        Returns:
+            Lista com o resultado de cada envio, na ordem das detecções
+        
+        Example:
+            >>> manager.notify_pest_detections([("Lagarta", 0.94), ("Pulgão", 0.81)])
+        """
+        timestamp = datetime.now().isoformat()
+        alerts = []
+        for pest_name, confidence in detections:
+            subject, message, severity = self._pest_alert(pest_name, confidence, image_path, location)
+            alerts.append((
+                f"[{severity.value}] {subject}",
+                f"[{AlertType.PEST_DETECTION.value}] {message}",
+                severity
+            ))
+        
+        if self.simulation_mode:
+            return [self._simulate_alert(subj, msg, timestamp, sev) for subj, msg, sev in alerts]
+        
+        batches = [
+            alerts[i:i + self.SNS_BATCH_SIZE]
+            for i in range(0, len(alerts), self.SNS_BATCH_SIZE)
+        ]
+        if len(batches) <= 1:
+            return [r for batch in batches for r in self._send_real_batch(batch, timestamp)]
+        
+        with ThreadPoolExecutor(max_workers=min(max_inflight, len(batches))) as pool:
+            sent = pool.map(lambda batch: self._send_real_batch(batch, timestamp), batches)
+            return [r for batch in sent for r in batch]
+    
+    def _send_real_batch(
+        self,
+        alerts: List[Tuple[str, str, AlertLevel]],
+        timestamp: str
+    ) -> List[Dict[str, Any]]:
+        """Publica até SNS_BATCH_SIZE alertas numa única chamada SNS PublishBatch."""
+        try:
+            response = self.sns_client.publish_batch(
+                TopicArn=self.topic_arn,
+                PublishBatchRequestEntries=[
+                    {'Id': str(i), 'Subject': subject[:100], 'Message': message}
+                    for i, (subject, message, _) in enumerate(alerts)
+                ]
+            )
+        except Exception as e:
+            logger.error(f"❌ Erro ao enviar lote via SNS: {e}")
+            response = {}
+        
+        message_ids = {
+            entry['Id']: entry.get('MessageId')
+            for entry in response.get('Successful', [])
+        }
+        
+        results = []
+        for i, (subject, message, severity) in enumerate(alerts):
+            if str(i) in message_ids:
+                with self._stats_lock:
+                    self._alerts_sent += 1
+                results.append({
+                    'success': True,
+                    'mode': 'real',
+                    'message_id': message_ids[str(i)],
+                    'timestamp': timestamp
+                })
+            else:
+                # Entrada recusada (ou lote inteiro falhou): mesmo fallback do envio unitário
+                with self._stats_lock:
+                    self._alerts_failed += 1
+                results.append(self._simulate_alert(subject, message, timestamp, severity))
+        
+        logger.info(f"✅ Lote SNS: {len(message_ids)}/{len(alerts)} alertas publicados")
+        return results
     
     def get_statistics(self) -> Dict[str, Any]:
-        """Retorna estatísticas de alertas."""
-        total = self._alerts_sent + self._alerts_failed
-        success_rate = (self._alerts_sent / total * 100) if total > 0 else 0
+        """Retorna estatísticas de alertas (snapshot consistente dos contadores)."""
+        # Uma única aquisição do lock; as taxas derivadas são calculadas fora dele
+        with self._stats_lock:
+            sent, failed = self._alerts_sent, self._alerts_failed
+        
+        total = sent + failed
+        success_rate = (sent / total * 100) if total > 0 else 0
         
         return {
-            'total_sent': self._alerts_sent,
-            'total_failed': self._alerts_failed,
+            'total_sent': sent,
+            'total_failed': failed,
             'success_rate': success_rate,
             'simulation_mode': self.simulation_mode
         }
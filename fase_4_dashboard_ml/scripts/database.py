@@ -8,6 +8,9 @@ def initialize_database():
     """Initialize the database and create tables if they don't exist."""
     with sqlite3.connect(DB_PATH) as conn:
         cursor = conn.cursor()
+        # WAL is persistent in the file: the dashboard's read-only connections
+        # keep reading while new sensor data is written
+        cursor.execute('PRAGMA journal_mode=WAL')
         # Create table aligned with simplified MER from Fase 2
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS irrigation_data (
@@ -22,6 +25,8 @@ def initialize_database():
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
         )
         ''')
+        # Index for the dashboard's "ORDER BY timestamp DESC LIMIT N" queries
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_irrigation_data_timestamp ON irrigation_data (timestamp)')
         conn.commit()
         print("Table created or already exists.")
 
@@ -0,0 +1,46 @@
+"""
+Regenerate irrigation_model.onnx from irrigation_model.joblib.
+
+The dashboard predicts through the ONNX export when onnxruntime is
+installed; run this after replacing the joblib model (train_model.py
+calls export_onnx itself). Requires skl2onnx.
+
+Usage (from this directory):
+    python export_onnx.py
+"""
+
+import os
+
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+
+MODEL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOBLIB_PATH = os.path.join(MODEL_DIR, 'irrigation_model.joblib')
+ONNX_PATH = os.path.join(MODEL_DIR, 'irrigation_model.onnx')
+
+
+def export_onnx(model, path):
+    """
+    Convert the trained pipeline to ONNX for fast single-row inference.
+
+    Args:
+        model: Fitted sklearn pipeline (scaler + RandomForestClassifier)
+        path (str): Destination .onnx file
+    """
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+
+    # zipmap off: probabilities come back as an array (what utils.OnnxModel expects)
+    onnx_model = convert_sklearn(
+        model,
+        initial_types=[('input', FloatTensorType([None, 4]))],
+        options={RandomForestClassifier: {'zipmap': False}},
+        target_opset=17
+    )
+    with open(path, 'wb') as f:
+        f.write(onnx_model.SerializeToString())
+
+
+if __name__ == '__main__':
+    export_onnx(joblib.load(JOBLIB_PATH), ONNX_PATH)
+    print(f"ONNX model saved to {ONNX_PATH}")
@@ -81,6 +81,16 @@ model_filename = '../irrigation_model.joblib'
 joblib.dump(grid_search.best_estimator_, model_filename)
 print(f"\nBest model saved to {model_filename}")
 
+# Optional ONNX export for fast single-row inference in the dashboard
+try:
+    from export_onnx import export_onnx
+
+    onnx_filename = '../irrigation_model.onnx'
+    export_onnx(grid_search.best_estimator_, onnx_filename)
+    print(f"ONNX model saved to {onnx_filename}")
+except ImportError:
+    print("skl2onnx not installed; skipping ONNX export")
+
 # Feature importance from the best model
 feature_names = ['humidity', 'phosphorus', 'potassium', 'ph']
 feature_importance = grid_search.best_estimator_['classifier'].feature_importances_
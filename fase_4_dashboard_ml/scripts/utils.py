@@ -3,10 +3,21 @@ Utility functions for the SmartFarmIrrigation Dashboard
 Provides modular functions for model loading, predictions, and explainability
 """
 
+import warnings
+
 import joblib
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+# onnxruntime is optional: without it the dashboard predicts with the joblib pipeline
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ort = None
+    ONNX_AVAILABLE = False
+
 
 def load_model(path):
     """
@@ -28,21 +39,71 @@ def load_model(path):
         return None
 
 
+class OnnxModel:
+    """
+    Minimal predict/predict_proba wrapper around an onnxruntime session.
+    
+    Expects the export from train_model.py (float input of shape [None, 4],
+    outputs [label, probabilities] with zipmap disabled), so it can be
+    passed to make_prediction in place of the sklearn pipeline.
+    """
+    
+    def __init__(self, session):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+    
+    def _run(self, input_data):
+        X = np.ascontiguousarray(input_data, dtype=np.float32)
+        return self.session.run(None, {self.input_name: X})
+    
+    def predict(self, input_data):
+        return self._run(input_data)[0]
+    
+    def predict_proba(self, input_data):
+        return np.asarray(self._run(input_data)[1])
+
+
+def load_onnx_model(path):
+    """
+    Load the ONNX export of the model for fast single-row inference.
+    
+    Args:
+        path (str): File path to the .onnx model
+        
+    Returns:
+        OnnxModel or None if onnxruntime is not installed or the file is missing
+    """
+    if not ONNX_AVAILABLE:
+        return None
+    try:
+        session = ort.InferenceSession(str(path), providers=['CPUExecutionProvider'])
+        return OnnxModel(session)
+    except Exception:
+        return None
+
+
 def make_prediction(model, input_data):
     """
     Make a prediction using the loaded model and input data.
     
     Args:
-        model: Trained model pipeline
-        input_data (pd.DataFrame): Input features for prediction
+        model: Trained model pipeline (or an OnnxModel)
+        input_data (pd.DataFrame | np.ndarray): Input features for prediction.
+            A plain array must follow the training column order
+            (humidity, phosphorus, potassium, ph) and skips DataFrame overhead.
         
     Returns:
         tuple: (prediction_label, confidence_percentage)
     """
     try:
-        # Make prediction
-        prediction = model.predict(input_data)[0]
-        prediction_proba = model.predict_proba(input_data)[0]
+        with warnings.catch_warnings():
+            if isinstance(input_data, np.ndarray):
+                # The pipeline was fitted on a DataFrame; positional input is expected here
+                warnings.filterwarnings('ignore', message='X does not have valid feature names')
+            
+            # Make prediction
+            prediction = model.predict(input_data)[0]
+            prediction_proba = model.predict_proba(input_data)[0]
         
         # Get confidence (probability of predicted class)
         confidence = prediction_proba[prediction] * 100
@@ -58,6 +119,24 @@ def make_prediction(model, input_data):
         return "ERROR", "0.0%"
 
 
+@st.cache_data(show_spinner=False)
+def _importance_frame(importances, feature_names):
+    """
+    Build the sorted feature importance chart data once per model.
+    
+    Args:
+        importances (bytes): Raw float32 feature importances (stable cache key)
+        feature_names (tuple): Feature names in training column order
+    
+    Returns:
+        pd.DataFrame: Importances indexed by feature, ascending
+    """
+    return pd.DataFrame({
+        'Feature': list(feature_names),
+        'Importance': np.frombuffer(importances, dtype=np.float32)
+    }).sort_values('Importance', ascending=True).set_index('Feature')
+
+
 def plot_feature_importance(model, feature_names):
     """
     Extract and display feature importances from the model.
@@ -71,14 +150,14 @@ def plot_feature_importance(model, feature_names):
         classifier = model.named_steps['classifier']
         feature_importances = classifier.feature_importances_
         
-        # Create DataFrame for feature importances
-        importance_df = pd.DataFrame({
-            'Feature': feature_names,
-            'Importance': feature_importances
-        }).sort_values('Importance', ascending=True)
+        # Chart data is cached per model: repeated clicks skip the DataFrame rebuild
+        importance_df = _importance_frame(
+            np.asarray(feature_importances, dtype=np.float32).tobytes(),
+            tuple(feature_names)
+        )
         
         # Display feature importance chart
-        st.bar_chart(importance_df.set_index('Feature')['Importance'])
+        st.bar_chart(importance_df['Importance'])
         
         # Display importance values
         st.markdown("**Feature Importance Values:**")
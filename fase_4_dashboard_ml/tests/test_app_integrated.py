@@ -0,0 +1,38 @@
+"""
+Testes Unitários para os helpers do dashboard integrado (app_integrated.py)
+"""
+
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Adiciona a raiz do projeto ao path para importar app_integrated
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app_integrated import _top_k_ascending
+
+
+class TestTopKAscending:
+    """Testes para o top-k usado nos gráficos da Fase 1"""
+
+    def test_unsigned_column_with_zeros_matches_nlargest(self):
+        """Testa que zeros em coluna uint32 não aparecem como os maiores valores"""
+        rng = np.random.default_rng(0)
+        values = rng.integers(1, 1_000_000, size=60)
+        values[:8] = 0
+        df = pd.DataFrame({'Producao (toneladas)': values.astype(np.uint32)})
+
+        top = _top_k_ascending(df, 'Producao (toneladas)')
+        expected = df.nlargest(10, 'Producao (toneladas)').sort_values('Producao (toneladas)')
+
+        assert top['Producao (toneladas)'].tolist() == expected['Producao (toneladas)'].tolist()
+        assert top['Producao (toneladas)'].is_monotonic_increasing
+
+    def test_small_frame_uses_nlargest(self):
+        """Testa o caminho de tabelas pequenas (menos de 50 linhas)"""
+        df = pd.DataFrame({'Producao (toneladas)': np.array([5, 0, 9, 3], dtype=np.uint8)})
+
+        top = _top_k_ascending(df, 'Producao (toneladas)', k=2)
+
+        assert top['Producao (toneladas)'].tolist() == [5, 9]
@@ -148,7 +148,18 @@ class TestFarmGeneticOptimizer:
         fitness = optimizer._fitness(population)
         
         assert fitness[0] == 0.0
-    
+
+    def test_fitness_matches_numpy_reference(self, optimizer):
+        """Testa que o fitness (JIT ou NumPy) bate com o cálculo de referência"""
+        rng = np.random.default_rng(0)
+        population = rng.integers(0, 2, size=(64, optimizer.num_items))
+
+        total_value = population @ optimizer.values
+        total_cost = population @ optimizer.costs
+        expected = np.where(total_cost <= optimizer.budget, total_value, 0.0)
+
+        np.testing.assert_array_equal(optimizer._fitness(population), expected)
+
     # ==========================================
     # TESTES DE SELEÇÃO
     # ==========================================
@@ -279,7 +290,25 @@ class TestFarmGeneticOptimizer:
         initial_max = history['Fitness Máximo'].iloc[0]
         
         assert final_max >= initial_max
-    
+
+    def test_optimize_island_model(self, sample_data):
+        """Testa o modelo de ilhas: histórico completo e solução dentro do orçamento"""
+        np.random.seed(42)
+        opt = FarmGeneticOptimizer(
+            items_df=sample_data,
+            budget=100,
+            population_size=24,
+            num_generations=45,
+            num_islands=3,
+            migration_period=10
+        )
+
+        selected, value, cost, history = opt.optimize()
+
+        assert len(history) == 45
+        assert cost <= opt.budget
+        assert value == 165  # ótimo global: Soja + Milho + Trigo
+
     def test_optimize_without_items_raises_error(self):
         """Testa que optimize sem itens gera erro"""
         opt = FarmGeneticOptimizer(items_df=None, budget=100)
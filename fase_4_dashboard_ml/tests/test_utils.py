@@ -14,7 +14,7 @@ scripts_path = os.path.join(os.path.dirname(__file__), '..', 'scripts')
 sys.path.insert(0, scripts_path)
 
 try:
-    from utils import load_model, make_prediction
+    from utils import ONNX_AVAILABLE, load_model, load_onnx_model, make_prediction
 except ImportError as e:
     pytest.skip(f"Could not import utils module: {e}", allow_module_level=True)
 
@@ -87,6 +87,24 @@ class TestUtilsFunctions:
         # Assert
         assert prediction_label == "DO NOT IRRIGATE"
         assert confidence == "90.0%"
+
+    def test_make_prediction_numpy_input(self):
+        """Test prediction with a plain numpy array in training column order"""
+        # Create mock model
+        mock_model = Mock()
+        mock_model.predict.return_value = np.array([1])
+        mock_model.predict_proba.return_value = np.array([[0.25, 0.75]])
+
+        # Create test input data (humidity, phosphorus, potassium, ph)
+        input_data = np.array([[45.0, 1, 1, 6.5]], dtype=np.float32)
+
+        # Test
+        prediction_label, confidence = make_prediction(mock_model, input_data)
+
+        # Assert
+        assert prediction_label == "IRRIGATE"
+        assert confidence == "75.0%"
+        mock_model.predict.assert_called_once_with(input_data)
     
     @patch('streamlit.error')
     def test_make_prediction_error_handling(self, mock_st_error):
@@ -139,5 +157,32 @@ class TestDataValidation:
         assert input_data['ph'].dtype in [np.float64, np.float32]
 
 
+
+@pytest.mark.skipif(not ONNX_AVAILABLE, reason="onnxruntime not installed")
+class TestOnnxParity:
+    """Test that the committed ONNX export matches the joblib model"""
+    
+    MODEL_DIR = os.path.join(os.path.dirname(__file__), '..')
+    
+    def test_onnx_matches_joblib_model(self):
+        """Test predictions and probabilities over random sensor readings"""
+        joblib_model = load_model(os.path.join(self.MODEL_DIR, 'irrigation_model.joblib'))
+        onnx_model = load_onnx_model(os.path.join(self.MODEL_DIR, 'irrigation_model.onnx'))
+        assert onnx_model is not None, "irrigation_model.onnx missing; run scripts/export_onnx.py"
+        
+        rng = np.random.default_rng(0)
+        n = 1000
+        X = np.column_stack([
+            rng.uniform(0, 100, n),   # humidity
+            rng.integers(0, 2, n),    # phosphorus
+            rng.integers(0, 2, n),    # potassium
+            rng.uniform(3, 10, n)     # ph
+        ])
+        # The pipeline was fitted on named columns; the ONNX graph takes a plain array
+        X_df = pd.DataFrame(X, columns=['humidity', 'phosphorus', 'potassium', 'ph'])
+        
+        np.testing.assert_array_equal(onnx_model.predict(X), joblib_model.predict(X_df))
+        np.testing.assert_allclose(onnx_model.predict_proba(X), joblib_model.predict_proba(X_df), atol=1e-5)
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,59 @@
+"""
+Testes Unitários para o runtime YOLO (ONNX Runtime)
+
+Cobre o pré/pós-processamento em NumPy, que não depende de onnxruntime.
+"""
+
+import numpy as np
+import sys
+import os
+from io import BytesIO
+from PIL import Image
+
+# Adiciona a raiz do projeto ao path para importar fase_6_vision_yolo
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fase_6_vision_yolo.yolo_runtime import Detections, encode_jpeg, letterbox, nms
+
+
+class TestYoloRuntime:
+    """Testes para as funções auxiliares do runtime YOLO"""
+
+    def test_letterbox_keeps_aspect_ratio(self):
+        """Testa que a imagem é escalada e centralizada no quadrado"""
+        padded, ratio, (pad_x, pad_y) = letterbox(Image.new('RGB', (1280, 640)), 640)
+
+        assert padded.shape == (640, 640, 3)
+        assert ratio == 0.5
+        assert (pad_x, pad_y) == (0, 160)
+
+    def test_nms_suppresses_overlapping_boxes(self):
+        """Testa que caixas muito sobrepostas mantêm apenas a de maior score"""
+        boxes = np.array([
+            [0, 0, 100, 100],
+            [5, 5, 105, 105],
+            [200, 200, 250, 250],
+        ], dtype=np.float32)
+        scores = np.array([0.8, 0.9, 0.7], dtype=np.float32)
+
+        keep = nms(boxes, scores, iou_thres=0.45)
+
+        assert keep.tolist() == [1, 2]
+
+    def test_detections_pandas_columns(self):
+        """Testa que pandas().xyxy segue as colunas do YOLOv5"""
+        det = np.array([[10, 20, 30, 40, 0.9, 1]], dtype=np.float32)
+        results = Detections([np.zeros((64, 64, 3), dtype=np.uint8)], [det], {0: 'Praga', 1: 'Banana'})
+
+        df = results.pandas().xyxy[0]
+
+        assert list(df.columns) == ['xmin', 'ymin', 'xmax', 'ymax', 'confidence', 'class', 'name']
+        assert df.loc[0, 'name'] == 'Banana'
+        assert results.render()[0].shape == (64, 64, 3)
+
+    def test_encode_jpeg_roundtrip(self):
+        """Testa que o JPEG gerado decodifica com o mesmo tamanho"""
+        data = encode_jpeg(np.full((48, 64, 3), 128, dtype=np.uint8))
+
+        assert data[:2] == b'\xff\xd8'
+        assert Image.open(BytesIO(data)).size == (64, 48)
@@ -0,0 +1,372 @@
+"""
+YOLO Runtime - Inferência YOLOv5 via ONNX Runtime / TensorRT
+=============================================================
+
+Executa o modelo YOLOv5 exportado para ONNX sem carregar PyTorch nem o
+repositório Ultralytics. O ONNX Runtime escolhe o melhor provider disponível:
+TensorRT (fusão Conv+BN+SiLU, FP16) -> CUDA -> CPU.
+
+Exportação (uma única vez, no repositório yolov5):
+    python export.py --weights best.pt --include onnx --imgsz 640
+
+Com o provider TensorRT, o engine compilado é gravado em `trt_cache/` ao lado
+do .onnx: o build (minutos) acontece só na primeira sessão; as seguintes,
+inclusive após reiniciar o servidor, apenas desserializam o engine do disco.
+
+Precisão: sem `precision` explícita, o TensorRT compila em INT8 quando existe a
+tabela de calibração `trt_cache/calib.cache` e em FP16 (Tensor Cores) sem ela.
+Exportações com `--half` (entrada float16) recebem o tensor já em float16.
+
+Classes:
+    - YoloOnnxModel: Sessão ONNX Runtime + pré/pós-processamento em NumPy
+    - Detections: Resultados com a mesma API usada no dashboard
+      (.xyxy, .names, .render(), .pandas().xyxy) dos resultados do YOLOv5
+
+Autor: FIAP IA Engineering Team - Fase 7 Integration
+"""
+
+import ast
+import os
+from io import BytesIO
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from PIL import Image, ImageDraw
+
+# onnxruntime é opcional: sem ele o dashboard volta para o torch.hub
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ort = None
+    ONNX_AVAILABLE = False
+
+# OpenCV é opcional: acelera o resize do letterbox
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    cv2 = None
+    CV2_AVAILABLE = False
+
+# Ordem de preferência dos providers (filtrada pelos disponíveis na instalação)
+PREFERRED_PROVIDERS = [
+    'TensorrtExecutionProvider',
+    'CUDAExecutionProvider',
+    'CPUExecutionProvider',
+]
+
+# Paleta para as caixas renderizadas (uma cor por classe, cíclica)
+_COLORS = [
+    (255, 56, 56), (255, 157, 151), (255, 112, 31), (255, 178, 29),
+    (207, 210, 49), (72, 249, 10), (146, 204, 23), (61, 219, 134),
+    (26, 147, 52), (0, 212, 187), (44, 153, 168), (0, 194, 255),
+]
+
+
+def letterbox(image, size: int = 640,
+              color: Tuple[int, int, int] = (114, 114, 114)) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Redimensiona mantendo a proporção e completa com bordas (como no YOLOv5).
+
+    Args:
+        image: Imagem PIL ou array HWC uint8 (RGB)
+        size: Lado do quadrado de entrada do modelo
+        color: Cor do preenchimento
+
+    Returns:
+        (array HWC uint8, escala aplicada, (pad_x, pad_y))
+    """
+    img = np.asarray(image.convert('RGB')) if isinstance(image, Image.Image) else image
+    h, w = img.shape[:2]
+    ratio = min(size / w, size / h)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    # cv2.resize (SIMD) quando disponível; PIL como alternativa
+    if CV2_AVAILABLE:
+        resized = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    else:
+        resized = np.asarray(Image.fromarray(img).resize((new_w, new_h), Image.BILINEAR))
+
+    canvas = np.full((size, size, 3), color, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+    return canvas, ratio, (pad_x, pad_y)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_thres: float) -> np.ndarray:
+    """
+    Non-Maximum Suppression em NumPy.
+
+    Args:
+        boxes: Array (N, 4) em xyxy
+        scores: Array (N,) de confianças
+        iou_thres: IoU máximo entre caixas mantidas
+
+    Returns:
+        Índices das caixas mantidas, em ordem decrescente de score
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-9)
+        order = order[1:][iou <= iou_thres]
+
+    return np.array(keep, dtype=np.int64)
+
+
+def encode_jpeg(image: np.ndarray, quality: int = 85) -> bytes:
+    """
+    Codifica uma imagem RGB (H, W, 3) uint8 em JPEG.
+
+    Usa o libjpeg-turbo do OpenCV quando disponível; senão, o PIL.
+
+    Args:
+        image: Imagem RGB, como as devolvidas por render()
+        quality: Qualidade JPEG (0-100)
+
+    Returns:
+        Bytes do arquivo JPEG
+    """
+    if CV2_AVAILABLE:
+        # OpenCV espera BGR
+        bgr = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        ok, buf = cv2.imencode('.jpg', bgr, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if ok:
+            return buf.tobytes()
+
+    buffered = BytesIO()
+    Image.fromarray(image).save(buffered, format='JPEG', quality=quality)
+    return buffered.getvalue()
+
+
+class Detections:
+    """
+    Resultados de detecção compatíveis com o objeto retornado pelo YOLOv5.
+
+    Attributes:
+        imgs (list): Imagens originais (arrays HWC uint8)
+        xyxy (list): Por imagem, array (N, 6) com x1, y1, x2, y2, confiança, classe
+        names (dict): Mapeamento id da classe -> nome
+    """
+
+    def __init__(self, imgs: List[np.ndarray], xyxy: List[np.ndarray], names: Dict[int, str]):
+        self.imgs = imgs
+        self.xyxy = xyxy
+        self.names = names
+
+    def __len__(self) -> int:
+        return len(self.xyxy)
+
+    def render(self) -> List[np.ndarray]:
+        """Desenha as caixas e rótulos sobre cópias das imagens originais"""
+        rendered = []
+        for img, det in zip(self.imgs, self.xyxy):
+            canvas = Image.fromarray(img)
+            draw = ImageDraw.Draw(canvas)
+            for x1, y1, x2, y2, conf, cls in det:
+                color = _COLORS[int(cls) % len(_COLORS)]
+                label = f"{self.names.get(int(cls), int(cls))} {conf:.2f}"
+                draw.rectangle((x1, y1, x2, y2), outline=color, width=3)
+                draw.text((x1 + 3, max(y1 - 12, 0)), label, fill=color)
+            rendered.append(np.asarray(canvas))
+        return rendered
+
+    def pandas(self) -> SimpleNamespace:
+        """Retorna `.xyxy` como lista de DataFrames (colunas do YOLOv5)"""
+        columns = ['xmin', 'ymin', 'xmax', 'ymax', 'confidence', 'class']
+        frames = []
+        for det in self.xyxy:
+            df = pd.DataFrame(det, columns=columns)
+            df['class'] = df['class'].astype(int)
+            df['name'] = [self.names.get(c, str(c)) for c in df['class']]
+            frames.append(df)
+        return SimpleNamespace(xyxy=frames)
+
+
+class YoloOnnxModel:
+    """
+    Modelo YOLOv5 exportado para ONNX, executado pelo ONNX Runtime.
+
+    Chamável como o modelo do torch.hub: `results = model(image)`.
+
+    Attributes:
+        session: onnxruntime.InferenceSession
+        names (dict): Nomes das classes (lidos dos metadados do export)
+        img_size (int): Lado da entrada do modelo
+        conf_thres (float): Confiança mínima
+        iou_thres (float): IoU do NMS
+        trt_cache_dir (Path): Onde o TensorRT persiste engines compilados
+        precision (str): 'fp32', 'fp16' ou 'int8' (aplicada pelo TensorRT); por
+            padrão 'int8' se houver `calib.cache` em trt_cache_dir, senão 'fp16'
+
+    Example:
+        >>> model = YoloOnnxModel('fase_6_vision_yolo/best.onnx')
+        >>> results = model(Image.open('praga.jpg'))
+        >>> results.pandas().xyxy[0]
+    """
+
+    def __init__(
+        self,
+        onnx_path: str,
+        conf_thres: float = 0.25,
+        iou_thres: float = 0.45,
+        providers: Optional[List[str]] = None,
+        trt_cache_dir: Optional[str] = None,
+        precision: Optional[str] = None,
+        img_size_default: int = 640
+    ):
+        if not ONNX_AVAILABLE:
+            raise ImportError("onnxruntime não instalado. Execute: pip install onnxruntime-gpu")
+
+        available = ort.get_available_providers()
+        providers = [p for p in (providers or PREFERRED_PROVIDERS) if p in available]
+        self.trt_cache_dir = Path(trt_cache_dir or Path(onnx_path).parent / 'trt_cache')
+        self.precision = precision or (
+            'int8' if (self.trt_cache_dir / 'calib.cache').exists() else 'fp16'
+        )
+
+        # Otimizações de grafo completas (constant folding, fusões, DCE) e todos os núcleos
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = os.cpu_count() or 1
+
+        self.session = ort.InferenceSession(
+            str(onnx_path),
+            sess_options=options,
+            providers=providers,
+            provider_options=[self._provider_options(p) for p in providers]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.input_dtype = np.float16 if self.session.get_inputs()[0].type == 'tensor(float16)' else np.float32
+        self.img_size = self._read_img_size(img_size_default)
+        # Exports com --dynamic têm a dimensão de lote simbólica (ex.: 'batch')
+        self.dynamic_batch = not isinstance(self.session.get_inputs()[0].shape[0], int)
+        self.conf_thres = conf_thres
+        self.iou_thres = iou_thres
+        self.names = self._read_names()
+
+    def _provider_options(self, provider: str) -> Dict[str, str]:
+        """Opções por provider; o TensorRT reutiliza engines e timings do disco"""
+        if provider != 'TensorrtExecutionProvider':
+            return {}
+        self.trt_cache_dir.mkdir(parents=True, exist_ok=True)
+        options = {
+            'trt_engine_cache_enable': 'True',
+            'trt_engine_cache_path': str(self.trt_cache_dir),
+            'trt_timing_cache_enable': 'True',
+            'trt_timing_cache_path': str(self.trt_cache_dir),
+        }
+        if self.precision in ('fp16', 'int8'):
+            options['trt_fp16_enable'] = 'True'
+        # INT8 exige a tabela de calibração (gerada offline com imagens de pragas)
+        if self.precision == 'int8' and (self.trt_cache_dir / 'calib.cache').exists():
+            options['trt_int8_enable'] = 'True'
+            options['trt_int8_calibration_table_name'] = 'calib.cache'
+        return options
+
+    def _read_img_size(self, default: int) -> int:
+        """
+        Lado da entrada do modelo. Com --dynamic o export.py deixa altura/largura
+        simbólicas ('height'/'width'): usa o imgsz dos metadados, se houver, ou o padrão.
+        """
+        side = self.session.get_inputs()[0].shape[2]
+        if isinstance(side, int):
+            return side
+        imgsz = self.session.get_modelmeta().custom_metadata_map.get('imgsz')
+        if imgsz:
+            imgsz = ast.literal_eval(imgsz)
+            return int(imgsz[0] if isinstance(imgsz, (list, tuple)) else imgsz)
+        return default
+
+    def _read_names(self) -> Dict[int, str]:
+        """Lê os nomes das classes gravados pelo export.py do YOLOv5"""
+        meta = self.session.get_modelmeta().custom_metadata_map
+        if 'names' in meta:
+            names = ast.literal_eval(meta['names'])
+            return dict(enumerate(names)) if isinstance(names, list) else names
+        num_classes = int(self.session.get_outputs()[0].shape[2]) - 5
+        return {i: str(i) for i in range(num_classes)}
+
+    def _preprocess(self, img: np.ndarray, out: np.ndarray) -> Tuple[float, Tuple[int, int]]:
+        """
+        Letterbox + HWC uint8 -> CHW normalizado, escrito direto em `out`
+        (fatia (3, S, S) do lote, no dtype da entrada: float32 ou float16).
+        """
+        padded, ratio, pad = letterbox(img, self.img_size)
+        # Transpõe, converte e normaliza numa única passada
+        np.multiply(padded.transpose(2, 0, 1), self.input_dtype(1 / 255), out=out)
+        return ratio, pad
+
+    def _postprocess(self, pred: np.ndarray, ratio: float, pad: Tuple[int, int],
+                     shape: Tuple[int, int]) -> np.ndarray:
+        """Filtro de confiança + NMS por classe + volta para coordenadas da imagem"""
+        # pred: (N, 5 + nc) com cx, cy, w, h, objectness, scores das classes
+        pred = pred[pred[:, 4] > self.conf_thres]
+        if not len(pred):
+            return np.zeros((0, 6), dtype=np.float32)
+
+        class_scores = pred[:, 5:] * pred[:, 4:5]
+        cls = class_scores.argmax(1)
+        conf = class_scores[np.arange(len(pred)), cls]
+        mask = conf > self.conf_thres
+        pred, cls, conf = pred[mask], cls[mask], conf[mask]
+
+        boxes = np.empty((len(pred), 4), dtype=np.float32)
+        boxes[:, 0] = pred[:, 0] - pred[:, 2] / 2
+        boxes[:, 1] = pred[:, 1] - pred[:, 3] / 2
+        boxes[:, 2] = pred[:, 0] + pred[:, 2] / 2
+        boxes[:, 3] = pred[:, 1] + pred[:, 3] / 2
+
+        # NMS por classe: desloca as caixas de cada classe para não se sobreporem
+        keep = nms(boxes + cls[:, None] * 4096.0, conf, self.iou_thres)
+        boxes, conf, cls = boxes[keep], conf[keep], cls[keep]
+
+        # Remove o letterbox e limita à imagem original
+        boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad[0]) / ratio
+        boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad[1]) / ratio
+        h, w = shape
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h)
+
+        return np.column_stack([boxes, conf, cls]).astype(np.float32)
+
+    def __call__(self, images) -> Detections:
+        """
+        Detecta objetos em uma imagem (PIL ou array HWC uint8 RGB) ou numa lista delas.
+
+        Com batch dinâmico no export, todas as imagens vão numa única
+        execução (N, 3, S, S); senão, o lote pré-alocado é enviado por fatias.
+        """
+        if isinstance(images, Image.Image) or (isinstance(images, np.ndarray) and images.ndim == 3):
+            images = [images]
+        imgs = [np.asarray(image.convert('RGB')) if isinstance(image, Image.Image) else np.asarray(image)
+                for image in images]
+
+        blob = np.empty((len(imgs), 3, self.img_size, self.img_size), dtype=self.input_dtype)
+        letterboxes = [self._preprocess(img, blob[i]) for i, img in enumerate(imgs)]
+
+        if self.dynamic_batch:
+            preds = self.session.run(None, {self.input_name: blob})[0]
+        else:
+            preds = [self.session.run(None, {self.input_name: blob[i:i + 1]})[0][0]
+                     for i in range(len(imgs))]
+
+        dets = [
+            self._postprocess(pred.astype(np.float32, copy=False), ratio, pad, img.shape[:2])
+            for pred, (ratio, pad), img in zip(preds, letterboxes, imgs)
+        ]
+        return Detections(imgs, dets, self.names)
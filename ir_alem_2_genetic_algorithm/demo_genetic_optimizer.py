@@ -16,7 +16,6 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'fase_4_dashboard_ml', 'scripts'))
 
 import pandas as pd
-import matplotlib.pyplot as plt
 from genetic_optimizer import FarmGeneticOptimizer, generate_sample_farm_items
 
 
@@ -211,7 +210,6 @@ def demo_visualizacao():
     
     output_file = 'demo_genetic_evolution.png'
     fig.savefig(output_file, dpi=150, bbox_inches='tight')
-    plt.close(fig)
     
     print(f"✅ Gráfico salvo: {output_file}")
     
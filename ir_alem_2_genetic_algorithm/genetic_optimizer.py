@@ -74,12 +74,115 @@ Data: 2025-11-21
 Versão: 2.0.0 (Refatorado com validações e novos recursos)
 """
 
+import os
 import numpy as np
 import pandas as pd
-import random as rd
-from random import randint
 from typing import List, Tuple, Dict
-import matplotlib.pyplot as plt
+# Figure direto (sem pyplot): nada fica retido no registro global de figuras
+from matplotlib.figure import Figure
+
+# Numba é opcional: sem ele, o fitness roda no laço NumPy original
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+@njit(cache=True, nogil=True) if NUMBA_AVAILABLE else (lambda func: func)
+def _fitness_kernel(population: np.ndarray, values: np.ndarray, costs: np.ndarray,
+                    budget: float) -> np.ndarray:
+    """
+    Kernel de fitness (Death Penalty) compilado com Numba.
+    
+    Opera apenas sobre arrays tipados (SoA): cromossomos em int8 e
+    valores/custos em float64, sem objetos Python no laço interno.
+    
+    Args:
+        population: Array 2D int8 (population_size x num_items)
+        values: Valores dos itens (float64)
+        costs: Custos dos itens (float64)
+        budget: Orçamento máximo
+        
+    Returns:
+        Array float64 com o fitness de cada indivíduo
+    """
+    num_individuals, num_items = population.shape
+    fitness = np.zeros(num_individuals)
+    
+    for i in range(num_individuals):
+        total_value = 0.0
+        total_cost = 0.0
+        for j in range(num_items):
+            if population[i, j] != 0:
+                total_value += values[j]
+                total_cost += costs[j]
+        if total_cost <= budget:
+            fitness[i] = total_value
+    
+    return fitness
+
+
+@njit(cache=True, nogil=True) if NUMBA_AVAILABLE else (lambda func: func)
+def _evolve_kernel(population: np.ndarray, values: np.ndarray, costs: np.ndarray,
+                   budget: float, num_generations: int, crossover_rate: float,
+                   mutation_rate: float, random_point: bool, seed: int):
+    """
+    Executa todas as gerações do AG num único kernel Numba.
+    
+    Mesma lógica de optimize(): fitness com Death Penalty, elitismo (metade
+    superior vira pais), crossover de um ponto entre pais consecutivos e
+    mutação bit-flip de um gene. A população (int8) é alterada no lugar.
+    Roda sem o GIL (nogil), então ilhas em threads executam em paralelo.
+    
+    Returns:
+        Tupla (população final, fitness médio por geração, fitness máximo por geração)
+    """
+    np.random.seed(seed)
+    population_size, num_genes = population.shape
+    num_parents = population_size // 2
+    num_offsprings = population_size - num_parents
+    
+    history_mean = np.empty(num_generations)
+    history_max = np.empty(num_generations)
+    parents = np.empty((num_parents, num_genes), dtype=population.dtype)
+    
+    for generation in range(num_generations):
+        fitness = _fitness_kernel(population, values, costs, budget)
+        history_mean[generation] = fitness.mean()
+        history_max[generation] = fitness.max()
+        
+        # Elitismo: ordenação estável mantém o desempate do argmax repetido
+        order = np.argsort(-fitness, kind='mergesort')
+        for p in range(num_parents):
+            parents[p, :] = population[order[p], :]
+        population[:num_parents, :] = parents
+        
+        for k in range(num_offsprings):
+            parent1 = k % num_parents
+            parent2 = (k + 1) % num_parents
+            
+            # Sem crossover o corte fica no fim: filho é clone do parent1
+            cut = num_genes
+            if np.random.random() <= crossover_rate:
+                cut = np.random.randint(1, num_genes) if random_point else num_genes // 2
+            
+            child = population[num_parents + k]
+            for j in range(num_genes):
+                child[j] = parents[parent1, j] if j < cut else parents[parent2, j]
+            
+            if np.random.random() <= mutation_rate:
+                gene = np.random.randint(0, num_genes)
+                child[gene] = 1 - child[gene]
+    
+    return population, history_mean, history_max
+
+
+# Compila o kernel na importação para não pagar o JIT na primeira otimização
+if NUMBA_AVAILABLE:
+    _fitness_kernel(np.zeros((1, 1), dtype=np.int8), np.zeros(1), np.zeros(1), 0.0)
+    _evolve_kernel(np.zeros((2, 2), dtype=np.int8), np.zeros(2), np.zeros(2), 0.0,
+                   1, 0.5, 0.5, False, 0)
 
 
 class FarmGeneticOptimizer:
@@ -104,6 +207,8 @@ class FarmGeneticOptimizer:
         crossover_rate (float): Taxa de crossover (0.0 a 1.0)
         mutation_rate (float): Taxa de mutação (0.0 a 1.0)
         crossover_type (str): Tipo de crossover - 'single_point' ou 'random_point'
+        num_islands (int): Número de ilhas (populações independentes com migração)
+        migration_period (int): Gerações entre migrações das ilhas
         best_solution (np.ndarray): Melhor solução encontrada (array binário)
         best_fitness (float): Melhor fitness alcançado
         convergence_generation (int): Geração em que a melhor solução foi encontrada
@@ -127,7 +232,9 @@ class FarmGeneticOptimizer:
         num_generations: int = 1000,
         crossover_rate: float = 0.8,
         mutation_rate: float = 0.15,
-        crossover_type: str = 'single_point'
+        crossover_type: str = 'single_point',
+        num_islands: int = 1,
+        migration_period: int = 50
     ):
         """
         Inicializa o otimizador genético.
@@ -140,11 +247,16 @@ class FarmGeneticOptimizer:
             crossover_rate: Probabilidade de crossover entre 0 e 1
             mutation_rate: Probabilidade de mutação entre 0 e 1
             crossover_type: Tipo de crossover - 'single_point' (fixo no meio) ou 'random_point' (aleatório)
+            num_islands: Ilhas evoluídas em paralelo, que dividem population_size
+                        entre si (tamanho par, mínimo 4 por ilha; requer Numba;
+                        sem ele roda uma única população)
+            migration_period: A cada quantas gerações o melhor de cada ilha migra
             
         Raises:
             ValueError: Se population_size for ímpar ou menor que 4
             ValueError: Se items_df não tiver as colunas necessárias
             ValueError: Se crossover_rate ou mutation_rate estiverem fora de [0, 1]
+            ValueError: Se num_islands ou migration_period forem menores que 1
         """
         # Validações
         if population_size < 4 or population_size % 2 != 0:
@@ -159,6 +271,9 @@ class FarmGeneticOptimizer:
         if crossover_type not in ['single_point', 'random_point']:
             raise ValueError("crossover_type deve ser 'single_point' ou 'random_point'")
         
+        if num_islands < 1 or migration_period < 1:
+            raise ValueError("num_islands e migration_period devem ser >= 1")
+        
         if items_df is not None:
             required_cols = {'Nome', 'Custo', 'Valor'}
             if not required_cols.issubset(items_df.columns):
@@ -174,6 +289,8 @@ class FarmGeneticOptimizer:
         self.crossover_rate = crossover_rate
         self.mutation_rate = mutation_rate
         self.crossover_type = crossover_type
+        self.num_islands = num_islands
+        self.migration_period = migration_period
         
         # Extrair arrays de custo e valor
         if items_df is not None:
@@ -181,11 +298,16 @@ class FarmGeneticOptimizer:
             self.values = items_df['Valor'].values
             self.item_names = items_df['Nome'].values
             self.num_items = len(items_df)
+            # Cópias contíguas em float64 para o kernel JIT de fitness
+            self._values_arr = np.ascontiguousarray(self.values, dtype=np.float64)
+            self._costs_arr = np.ascontiguousarray(self.costs, dtype=np.float64)
         else:
             self.costs = None
             self.values = None
             self.item_names = None
             self.num_items = 0
+            self._values_arr = None
+            self._costs_arr = None
             
         # Armazenar histórico de fitness
         self.fitness_history = []
@@ -212,19 +334,20 @@ class FarmGeneticOptimizer:
         Returns:
             Array com o fitness de cada indivíduo (valores não-negativos)
         """
-        fitness = np.empty(len(population))
+        if NUMBA_AVAILABLE:
+            return _fitness_kernel(
+                np.ascontiguousarray(population, dtype=np.int8),
+                self._values_arr,
+                self._costs_arr,
+                float(self.budget)
+            )
         
-        for i in range(len(fitness)):
-            total_value = np.sum(population[i] * self.values)
-            total_cost = np.sum(population[i] * self.costs)
-            
-            # Death Penalty: soluções inválidas recebem fitness 0
-            if total_cost <= self.budget:
-                fitness[i] = total_value
-            else:
-                fitness[i] = 0
-                
-        return fitness.astype(float)
+        # Sem Numba: dois produtos matriz-vetor (BLAS) avaliam a população inteira
+        total_values = population @ self._values_arr
+        total_costs = population @ self._costs_arr
+        
+        # Death Penalty: soluções inválidas recebem fitness 0
+        return np.where(total_costs <= self.budget, total_values, 0.0)
     
     def _selection(self, fitness: np.ndarray, num_parents: int, population: np.ndarray) -> np.ndarray:
         """
@@ -257,6 +380,9 @@ class FarmGeneticOptimizer:
         """
         Realiza crossover de um ponto para gerar descendentes.
         
+        Caminho sem Numba: com Numba instalado, optimize() roda _evolve_kernel,
+        que reproduz esta mesma lógica dentro do kernel JIT.
+        
         Tipos de Crossover:
             - 'single_point': Ponto de corte fixo no meio do cromossomo
             - 'random_point': Ponto de corte aleatório para cada par de pais
@@ -271,49 +397,34 @@ class FarmGeneticOptimizer:
         Returns:
             Array com os descendentes gerados (shape: num_offsprings x num_items)
         """
-        offsprings = np.empty((num_offsprings, parents.shape[1]))
+        num_parents, num_genes = parents.shape
+        idx = np.arange(num_offsprings)
         
-        # Define o ponto de crossover baseado no tipo
-        if self.crossover_type == 'single_point':
-            crossover_point = int(parents.shape[1] / 2)
+        # Pares de pais (i, i+1) em rodízio, como no laço original
+        parent1 = parents[idx % num_parents]
+        parent2 = parents[(idx + 1) % num_parents]
         
-        cnt_offsprings = 0
-        i = 0
-        max_attempts = num_offsprings * 10  # Evita loop infinito
+        # Decide, para todos os filhos de uma vez, se aplica crossover e onde corta
+        do_crossover = np.random.random(num_offsprings) <= self.crossover_rate
+        if self.crossover_type == 'random_point':
+            crossover_point = np.random.randint(1, num_genes, size=num_offsprings)
+        else:
+            crossover_point = np.full(num_offsprings, num_genes // 2)
         
-        while cnt_offsprings < num_offsprings and i < max_attempts:
-            parent1_index = i % parents.shape[0]
-            parent2_index = (i + 1) % parents.shape[0]
-            
-            # Decide se aplica crossover baseado na taxa
-            if rd.random() <= self.crossover_rate:
-                # Ponto de crossover aleatório se configurado
-                if self.crossover_type == 'random_point':
-                    crossover_point = randint(1, parents.shape[1] - 1)
-                
-                # Realiza crossover
-                offsprings[cnt_offsprings, 0:crossover_point] = parents[parent1_index, 0:crossover_point]
-                offsprings[cnt_offsprings, crossover_point:] = parents[parent2_index, crossover_point:]
-                cnt_offsprings += 1
-            else:
-                # Sem crossover: copia parent1 diretamente (clonagem)
-                offsprings[cnt_offsprings, :] = parents[parent1_index, :]
-                cnt_offsprings += 1
-            
-            i += 1
+        # Máscara booleana (filhos x genes): True herda do parent1, False do parent2.
+        # Sem crossover a linha inteira vem do parent1 (clonagem).
+        take_parent1 = (np.arange(num_genes) < crossover_point[:, None]) | ~do_crossover[:, None]
+        offsprings = np.where(take_parent1, parent1, parent2)
         
-        # Se não conseguiu gerar todos os filhos, completa com clones dos pais
-        while cnt_offsprings < num_offsprings:
-            parent_idx = cnt_offsprings % parents.shape[0]
-            offsprings[cnt_offsprings, :] = parents[parent_idx, :]
-            cnt_offsprings += 1
-            
         return offsprings
     
     def _mutation(self, offsprings: np.ndarray) -> np.ndarray:
         """
         Aplica mutação de inversão de bit (Bit-Flip Mutation) aos descendentes.
         
+        Caminho sem Numba: com Numba instalado, optimize() roda _evolve_kernel,
+        que reproduz esta mesma mutação dentro do kernel JIT.
+        
         Para cada descendente, há uma chance (mutation_rate) de mutar.
         Se mutação ocorrer, um gene aleatório é invertido (0→1 ou 1→0).
         
@@ -326,18 +437,16 @@ class FarmGeneticOptimizer:
         Returns:
             Array com descendentes mutados (mesma shape)
         """
-        mutants = np.empty(offsprings.shape)
+        mutants = offsprings.copy()
+        
+        # Sorteia quais filhos mutam e qual gene de cada um é invertido
+        do_mutation = np.random.random(len(mutants)) <= self.mutation_rate
+        rows = np.flatnonzero(do_mutation)
+        gene_idx = np.random.randint(0, offsprings.shape[1], size=len(rows))
+        
+        # Inverte o bit (0→1 ou 1→0) de todos os mutantes numa única operação
+        mutants[rows, gene_idx] = 1 - mutants[rows, gene_idx]
         
-        for i in range(mutants.shape[0]):
-            mutants[i, :] = offsprings[i, :]
-            
-            # Aplica mutação baseado na taxa
-            if rd.random() <= self.mutation_rate:
-                # Seleciona gene aleatório para inverter
-                gene_idx = randint(0, offsprings.shape[1] - 1)
-                # Inverte o bit (0→1 ou 1→0)
-                mutants[i, gene_idx] = 1 - mutants[i, gene_idx]
-                
         return mutants
     
     def optimize(self) -> Tuple[List[str], float, float, pd.DataFrame]:
@@ -355,44 +464,76 @@ class FarmGeneticOptimizer:
             raise ValueError("Items DataFrame não foi fornecido ou está vazio")
         
         # Inicializa população aleatória
-        population = np.random.randint(2, size=(self.population_size, self.num_items))
-        population = population.astype(int)
-        
-        # Calcula número de pais e filhos
-        num_parents = int(self.population_size / 2)
-        num_offsprings = self.population_size - num_parents
+        # Cromossomos como bitboard uint8 (um byte por gene, 0 ou 1)
+        population = np.random.randint(2, size=(self.population_size, self.num_items)).astype(np.uint8)
         
-        # Histórico para visualização
-        fitness_history_mean = []
-        fitness_history_max = []
-        
-        # Loop principal do algoritmo genético
-        for generation in range(self.num_generations):
-            # Avalia fitness da população atual
-            fitness = self._fitness(population)
+        if NUMBA_AVAILABLE and self.num_islands > 1:
+            population, history_mean, history_max = self._evolve_islands(population)
+            fitness_history_mean = history_mean.tolist()
+            fitness_history_max = history_max.tolist()
+            
+            best_generation = int(np.argmax(history_max))
+            if history_max[best_generation] > self.best_fitness:
+                self.best_fitness = history_max[best_generation]
+                self.convergence_generation = best_generation
+        elif NUMBA_AVAILABLE:
+            # Todas as gerações num único kernel JIT; a seed vem do np.random
+            # global, então np.random.seed continua reproduzindo a execução
+            population, history_mean, history_max = _evolve_kernel(
+                np.ascontiguousarray(population, dtype=np.int8),
+                self._values_arr,
+                self._costs_arr,
+                float(self.budget),
+                self.num_generations,
+                float(self.crossover_rate),
+                float(self.mutation_rate),
+                self.crossover_type == 'random_point',
+                np.random.randint(2**31 - 1)
+            )
+            fitness_history_mean = history_mean.tolist()
+            fitness_history_max = history_max.tolist()
+            
+            # Primeira geração que atingiu o melhor fitness
+            best_generation = int(np.argmax(history_max))
+            if history_max[best_generation] > self.best_fitness:
+                self.best_fitness = history_max[best_generation]
+                self.convergence_generation = best_generation
+        else:
+            # Calcula número de pais e filhos
+            num_parents = int(self.population_size / 2)
+            num_offsprings = self.population_size - num_parents
+            
+            # Histórico para visualização
+            fitness_history_mean = []
+            fitness_history_max = []
             
-            # Armazena estatísticas
-            fitness_history_mean.append(np.mean(fitness))
-            fitness_history_max.append(np.max(fitness))
+            # Loop principal do algoritmo genético
+            for generation in range(self.num_generations):
+                # Avalia fitness da população atual
+                fitness = self._fitness(population)
             
-            # Rastreia a melhor solução encontrada até agora
-            gen_best_fitness = np.max(fitness)
-            if gen_best_fitness > self.best_fitness:
-                self.best_fitness = gen_best_fitness
-                self.convergence_generation = generation
+                # Armazena estatísticas
+                fitness_history_mean.append(np.mean(fitness))
+                fitness_history_max.append(np.max(fitness))
             
-            # Seleciona os melhores para reprodução
-            parents = self._selection(fitness, num_parents, population)
+                # Rastreia a melhor solução encontrada até agora
+                gen_best_fitness = np.max(fitness)
+                if gen_best_fitness > self.best_fitness:
+                    self.best_fitness = gen_best_fitness
+                    self.convergence_generation = generation
             
-            # Gera descendentes via crossover
-            offsprings = self._crossover(parents, num_offsprings)
+                # Seleciona os melhores para reprodução
+                parents = self._selection(fitness, num_parents, population)
             
-            # Aplica mutação
-            mutants = self._mutation(offsprings)
+                # Gera descendentes via crossover
+                offsprings = self._crossover(parents, num_offsprings)
             
-            # Forma nova população (elitismo: mantém melhores pais + novos mutantes)
-            population[0:parents.shape[0], :] = parents
-            population[parents.shape[0]:, :] = mutants
+                # Aplica mutação
+                mutants = self._mutation(offsprings)
+            
+                # Forma nova população (elitismo: mantém melhores pais + novos mutantes)
+                population[0:parents.shape[0], :] = parents
+                population[parents.shape[0]:, :] = mutants
         
         # Avalia fitness da última geração
         fitness_last_gen = self._fitness(population)
@@ -433,7 +574,66 @@ class FarmGeneticOptimizer:
             history_df
         )
     
-    def plot_fitness_evolution(self, figsize: Tuple[int, int] = (12, 6)) -> plt.Figure:
+    def _evolve_islands(self, first_island: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Modelo de ilhas: num_islands populações evoluem em threads (kernel nogil).
+        
+        population_size é dividido entre as ilhas (tamanho par, mínimo 4 por
+        ilha), então o custo total por geração não cresce com num_islands.
+        A cada migration_period gerações, o melhor indivíduo de cada ilha
+        substitui o pior da ilha seguinte (topologia em anel).
+        
+        Args:
+            first_island: População inicial; a primeira ilha usa suas primeiras linhas
+            
+        Returns:
+            Tupla (todas as ilhas concatenadas, fitness médio e máximo por geração)
+        """
+        from joblib import Parallel, delayed
+        
+        island_size = max(4, self.population_size // self.num_islands // 2 * 2)
+        islands = [np.ascontiguousarray(first_island[:island_size], dtype=np.int8)] + [
+            np.random.randint(2, size=(island_size, self.num_items)).astype(np.int8)
+            for _ in range(self.num_islands - 1)
+        ]
+        args = (
+            self._values_arr, self._costs_arr, float(self.budget),
+            float(self.crossover_rate), float(self.mutation_rate),
+            self.crossover_type == 'random_point'
+        )
+        history_mean, history_max = [], []
+        
+        # Um único pool de threads reaproveitado por todas as épocas
+        with Parallel(n_jobs=min(self.num_islands, os.cpu_count() or 1), prefer='threads') as parallel:
+            for start in range(0, self.num_generations, self.migration_period):
+                steps = min(self.migration_period, self.num_generations - start)
+                seeds = np.random.randint(2**31 - 1, size=self.num_islands)
+                epoch = parallel(
+                    delayed(_evolve_kernel)(
+                        island, args[0], args[1], args[2], steps,
+                        args[3], args[4], args[5], int(seed)
+                    )
+                    for island, seed in zip(islands, seeds)
+                )
+                islands = [pop for pop, _, _ in epoch]
+                # Ilhas do mesmo tamanho: média global = média das médias
+                history_mean.append(np.mean([mean for _, mean, _ in epoch], axis=0))
+                history_max.append(np.max([hmax for _, _, hmax in epoch], axis=0))
+                
+                # Migração em anel: melhor da ilha i entra no lugar do pior da ilha i+1
+                fitness = [_fitness_kernel(pop, *args[:3]) for pop in islands]
+                migrants = [pop[np.argmax(fit)].copy() for pop, fit in zip(islands, fitness)]
+                for i, migrant in enumerate(migrants):
+                    target = (i + 1) % self.num_islands
+                    islands[target][np.argmin(fitness[target])] = migrant
+        
+        return (
+            np.concatenate(islands).astype(np.uint8),
+            np.concatenate(history_mean),
+            np.concatenate(history_max)
+        )
+    
+    def plot_fitness_evolution(self, figsize: Tuple[int, int] = (12, 6)) -> Figure:
         """
         Plota a evolução do fitness ao longo das gerações.
         
@@ -446,7 +646,8 @@ class FarmGeneticOptimizer:
         if len(self.fitness_history) == 0:
             raise ValueError("Execute optimize() primeiro para gerar dados")
         
-        fig, ax = plt.subplots(figsize=figsize)
+        fig = Figure(figsize=figsize)
+        ax = fig.subplots()
         
         ax.plot(
             self.fitness_history['Geração'], 
@@ -469,7 +670,7 @@ class FarmGeneticOptimizer:
         ax.legend(fontsize=10)
         ax.grid(True, alpha=0.3)
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig
     
     def get_summary(self) -> Dict[str, any]:
@@ -668,7 +869,7 @@ if __name__ == "__main__":
     print(f"\n{'─' * 70}")
     print("📈 Gerando gráfico de evolução do fitness...")
     fig = optimizer.plot_fitness_evolution(figsize=(14, 7))
-    plt.savefig('genetic_optimization_evolution.png', dpi=150, bbox_inches='tight')
+    fig.savefig('genetic_optimization_evolution.png', dpi=150, bbox_inches='tight')
     print("   ✅ Gráfico salvo: 'genetic_optimization_evolution.png'")
     
     # Análise de sensibilidade (opcional - comentado pois demora)